@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Counts pre-aggregated over the dimensions every chart is built from, so that a year
+# range (optionally within one director) is answered by slicing and summing small arrays
+# instead of visiting movie rows:
+#
+#   year_movies      movies per year                        (years,)
+#   year_genre       genre tokens per year and genre        (years, genres)
+#   director_year    movies per director and year           sparse (directors, years)
+#   director_genre   genre tokens per director, year, genre sparse (directors, years * genres)
+#   sketches         per year, the most cast actors         top-K (actor, count, error)
+#
+# Years are one contiguous range starting at first_year, so a year range is one slice.
+# Genre and director codes are the dataset's TokenIndex and FilterEngine codes.
+
+# Actors tracked per year by the top-K sketches
+SKETCH_SIZE = 50
+
+# Genres shown by name in the stacked charts; the rest are summed into "Other"
+STACKED_GENRES = 8
+
+
+class AggregateCube:
+    def __init__(self):
+        self.first_year = 0
+        self.n_years = 0
+        self.n_genres = 0
+        self.n_directors = 0
+        self.year_movies = np.zeros(0, dtype=np.int64)
+        self.year_genre = np.zeros((0, 0), dtype=np.int64)
+        self.director_year = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self.director_genre = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self.sketches = []
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        cube = cls()
+        filters = dataset.filters
+        cube.add(dataset.years, filters.director_codes, len(filters.director_labels),
+                 (dataset.genre_index.rows, dataset.genre_index.codes, len(dataset.genre_index.labels)),
+                 (dataset.cast_index.rows, dataset.cast_index.codes))
+        return cube
+
+    def add(self, years, director_codes, n_directors, genre_tokens, cast_tokens):
+        # Count a batch of movies in. `genre_tokens` is (rows, codes, number of genre
+        # labels) and `cast_tokens` is (rows, codes), with rows indexing into `years` and
+        # `director_codes`. Used both for the initial build and for appended rows.
+        years = np.asarray(years, dtype=np.float64)
+        dated = ~np.isnan(years)
+        if dated.any():
+            self._grow(int(years[dated].min()), int(years[dated].max()), genre_tokens[2], n_directors)
+        else:
+            self._grow(None, None, genre_tokens[2], n_directors)
+
+        year_index = np.full(len(years), -1, dtype=np.int64)
+        year_index[dated] = years[dated].astype(np.int64) - self.first_year
+        director_codes = np.asarray(director_codes, dtype=np.int64)
+
+        # Movies per year, and per director and year
+        self.year_movies += np.bincount(year_index[dated], minlength=self.n_years)
+        keep = dated & (director_codes >= 0)
+        self.director_year = self.director_year + self._counts(director_codes[keep], year_index[keep],
+                                                              self.director_year.shape)
+
+        # Genre tokens per year and genre, and per director too
+        rows, codes, _ = genre_tokens
+        token_years = year_index[rows]
+        keep = token_years >= 0
+        cells = token_years[keep] * self.n_genres + codes[keep]
+        self.year_genre += np.bincount(cells, minlength=self.n_years * self.n_genres).reshape(self.n_years, self.n_genres)
+        token_directors = director_codes[rows[keep]]
+        has_director = token_directors >= 0
+        self.director_genre = self.director_genre + self._counts(token_directors[has_director], cells[has_director],
+                                                                self.director_genre.shape)
+
+        # Actor appearances per year, merged into the sketches
+        rows, codes = cast_tokens
+        token_years = year_index[rows]
+        keep = token_years >= 0
+        self._merge_sketches(token_years[keep], np.asarray(codes)[keep])
+
+    def _counts(self, row_codes, column_codes, shape):
+        counts = sparse.csr_matrix((np.ones(len(row_codes), dtype=np.int64), (row_codes, column_codes)), shape=shape)
+        counts.sum_duplicates()
+        return counts
+
+    def _grow(self, first_year, last_year, n_genres, n_directors):
+        # Widen the year range and the genre/director axes to fit a new batch
+        if self.n_years == 0:
+            front = 0
+            if first_year is not None:
+                self.first_year = first_year
+                self.n_years = last_year - first_year + 1
+                self.year_movies = np.zeros(self.n_years, dtype=np.int64)
+                self.year_genre = np.zeros((self.n_years, self.n_genres), dtype=np.int64)
+                self.sketches = [_empty_sketch() for _ in range(self.n_years)]
+            new_years = self.n_years
+        else:
+            front = max(0, self.first_year - first_year) if first_year is not None else 0
+            back = max(0, last_year - (self.first_year + self.n_years - 1)) if last_year is not None else 0
+            new_years = self.n_years + front + back
+            self.year_movies = np.pad(self.year_movies, (front, back))
+            self.year_genre = np.pad(self.year_genre, ((front, back), (0, 0)))
+            self.sketches = ([_empty_sketch() for _ in range(front)] + self.sketches
+                             + [_empty_sketch() for _ in range(back)])
+            self.first_year -= front
+
+        new_genres = max(self.n_genres, n_genres)
+        new_directors = max(self.n_directors, n_directors)
+        if new_genres != self.n_genres:
+            self.year_genre = np.pad(self.year_genre, ((0, 0), (0, new_genres - self.n_genres)))
+
+        # Existing sparse entries only move when years are added in front or genres are
+        # added (the flattened year * genres + genre index changes); otherwise just resize
+        director_year = self.director_year.tocoo()
+        self.director_year = sparse.csr_matrix((director_year.data, (director_year.row, director_year.col + front)),
+                                               shape=(new_directors, new_years))
+        director_genre = self.director_genre.tocoo()
+        if self.n_genres:
+            year, genre = np.divmod(director_genre.col, self.n_genres)
+        else:
+            year = genre = director_genre.col
+        self.director_genre = sparse.csr_matrix(
+            (director_genre.data, (director_genre.row, (year + front) * new_genres + genre)),
+            shape=(new_directors, new_years * new_genres))
+
+        self.n_years = new_years
+        self.n_genres = new_genres
+        self.n_directors = new_directors
+
+    def _merge_sketches(self, token_years, actor_codes):
+        # Weighted Space-Saving: a year's sketch keeps SKETCH_SIZE actors. Actors not yet
+        # tracked in a full sketch come in with that sketch's smallest count as their
+        # possible error, so counts never undershoot for tracked actors. A sketch built
+        # from a single batch is exact.
+        if len(actor_codes) == 0:
+            return
+        n_actors = int(actor_codes.max()) + 1
+        cells, counts = np.unique(token_years * n_actors + actor_codes, return_counts=True)
+        cell_years, cell_actors = np.divmod(cells, n_actors)
+        bounds = np.searchsorted(cell_years, np.arange(self.n_years + 1))
+
+        for year in np.unique(cell_years):
+            actors = cell_actors[bounds[year]:bounds[year + 1]]
+            added = counts[bounds[year]:bounds[year + 1]]
+            old_actors, old_counts, old_errors = self.sketches[year]
+            floor = old_counts.min() if len(old_actors) >= SKETCH_SIZE else 0
+
+            merged_actors = np.union1d(old_actors, actors)
+            merged_counts = np.full(len(merged_actors), floor, dtype=np.int64)
+            merged_errors = np.full(len(merged_actors), floor, dtype=np.int64)
+            tracked = np.searchsorted(merged_actors, old_actors)
+            merged_counts[tracked] = old_counts
+            merged_errors[tracked] = old_errors
+            merged_counts[np.searchsorted(merged_actors, actors)] += added
+
+            top = np.argsort(-merged_counts, kind='stable')[:SKETCH_SIZE]
+            top = np.sort(top)
+            self.sketches[year] = (merged_actors[top], merged_counts[top], merged_errors[top])
+
+    def year_slice(self, year_min, year_max):
+        start = min(max(int(year_min) - self.first_year, 0), self.n_years)
+        stop = min(max(int(year_max) - self.first_year + 1, start), self.n_years)
+        return slice(start, stop)
+
+    def years(self, years):
+        return np.arange(years.start, years.stop) + self.first_year
+
+    def director_years(self, director_code):
+        # Movies per year for one director, as a dense array over the whole year axis
+        if director_code < 0:
+            return np.zeros(self.n_years, dtype=np.int64)
+        return self.director_year[director_code].toarray().ravel()
+
+    def year_counts(self, years, director_code=None):
+        # (year values, movie counts) for the years in the slice that have movies
+        if director_code is None:
+            counts = self.year_movies[years]
+        else:
+            counts = self.director_years(director_code)[years]
+        present = counts > 0
+        return self.years(years)[present], counts[present]
+
+    def genre_year_counts(self, years, director_code=None):
+        # Genre tokens per year (rows) and genre (columns) over the slice
+        if director_code is None:
+            return self.year_genre[years]
+        if director_code < 0:
+            return np.zeros((years.stop - years.start, self.n_genres), dtype=np.int64)
+        flat = self.director_genre[director_code].toarray().ravel()
+        return flat.reshape(self.n_years, self.n_genres)[years]
+
+    def genre_counts(self, years, director_code=None):
+        return self.genre_year_counts(years, director_code).sum(axis=0)
+
+    def director_counts(self, years):
+        # Movies per director over the slice
+        return np.asarray(self.director_year[:, years].sum(axis=1)).ravel()
+
+    def director_genre_counts(self, years, director_codes):
+        # Genre tokens per director (rows, in the given order) and genre over the slice
+        flat = self.director_genre[np.asarray(director_codes)].toarray()
+        return flat.reshape(len(director_codes), self.n_years, self.n_genres)[:, years].sum(axis=1)
+
+    def top_actors(self, years, n=5):
+        # Estimated most cast actors over the slice: the per-year sketches summed. A year's
+        # count can overstate an actor by up to that sketch's error for them (after merged
+        # batches), and years where the actor is not in the sketch add nothing, so an
+        # estimate can be too high or too low. Exact only when every year's sketch was
+        # built from one batch and holds the actor.
+        sketches = self.sketches[years]
+        if not sketches:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        actors = np.concatenate([actors for actors, _, _ in sketches])
+        counts = np.concatenate([counts for _, counts, _ in sketches])
+        if len(actors) == 0:
+            return actors, counts
+        codes, inverse = np.unique(actors, return_inverse=True)
+        totals = np.bincount(inverse, weights=counts).astype(np.int64)
+        top = np.argsort(-totals, kind='stable')[:n]
+        return codes[top], totals[top]
+
+
+def _empty_sketch():
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+
+def stacked_genre_table(counts, index, genre_labels, top=STACKED_GENRES):
+    # Counts per row (e.g. year or director) and genre as a DataFrame for a stacked
+    # chart: the `top` genres with the most tokens overall by name, the rest as "Other"
+    counts = np.asarray(counts)
+    totals = counts.sum(axis=0)
+    order = np.argsort(-totals, kind='stable')
+    shown = order[:top][totals[order[:top]] > 0]
+    table = pd.DataFrame(counts[:, shown], index=index, columns=list(np.asarray(genre_labels, dtype=object)[shown]))
+    other = counts.sum(axis=1) - table.sum(axis=1).to_numpy()
+    if other.any():
+        table['Other'] = other
+    return table
@@ -0,0 +1,296 @@
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from backends import BACKENDS
+from movie_data import AggregateCache, SourceRewritten
+
+# Local HTTP/JSON API serving the numbers the dashboard draws, from the same data engine.
+# The CSV is loaded once; every endpoint takes the dashboard's filters as query
+# parameters and answers with JSON:
+#
+#   python api_server.py IMDB-Movie-Dataset.csv --port 8050
+#   curl 'http://127.0.0.1:8050/api/genres?year_min=1990&year_max=1999&director=Yash%20Chopra'
+#
+#   /api/years      movies per year            /api/genres   top genres
+#   /api/directors  top directors              /api/actors   most cast actors
+#   /api/info       dataset and cache status   /api/health   liveness check
+#
+# Parameters: year_min, year_max (default: every year), director, search. Encoded
+# responses are kept in an LRU cache keyed by the filters and the data fingerprint.
+# Connections are served on one asyncio event loop; queries run on a single worker
+# thread so the loop stays free for I/O and cache hits, and concurrent requests for the
+# same uncached response share one computation.
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+
+# Encoded responses kept in the cache
+CACHE_ENTRIES = 1024
+
+# Entries returned by the top-N endpoints, as in the dashboard's charts
+TOP_N = 10
+
+# Longest request head accepted, in header lines
+MAX_HEADER_LINES = 100
+
+ENDPOINTS = ['years', 'genres', 'directors', 'actors']
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _records(series, key, value):
+    return [{key: label.item() if hasattr(label, 'item') else label, value: int(count)}
+            for label, count in series.items()]
+
+
+class AggregateService:
+    # The queries behind the endpoints, on one loaded dataset. compute() runs on the
+    # worker thread; everything else is cheap enough for the event loop.
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.year_range = dataset.year_range() or (0, 0)
+
+    def filters(self, query):
+        # (year_min, year_max, director, search) from the query string, with the same
+        # meaning as the dashboard's filter controls
+        params = {name: values[-1] for name, values in parse_qs(query).items()}
+        unknown = set(params) - {'year_min', 'year_max', 'director', 'search'}
+        if unknown:
+            raise BadRequest(f"Unknown parameter: {', '.join(sorted(unknown))}")
+
+        years = []
+        for name, default in [('year_min', self.year_range[0]), ('year_max', self.year_range[1])]:
+            try:
+                years.append(int(params.get(name, default)))
+            except ValueError:
+                raise BadRequest(f"{name} must be a year") from None
+
+        director = params.get('director') or None
+        if director == "All Directors":
+            director = None
+        return years[0], years[1], director, params.get('search', '')
+
+    def compute(self, endpoint, filters):
+        year_min, year_max, director, search = filters
+        rows = self.dataset.select(year_min, year_max, director, search)
+        result = {
+            'filters': {'year_min': year_min, 'year_max': year_max, 'director': director, 'search': search},
+        }
+
+        if endpoint == 'years':
+            aggregates = self.dataset.aggregates("Movies by Year", rows, director, search)
+            result['total'] = aggregates['total']
+            result['years'] = _records(aggregates['year_counts'], 'year', 'movies')
+        elif endpoint == 'genres':
+            aggregates = self.dataset.aggregates("Genre Distribution", rows, director, search)
+            result['total'] = aggregates['total']
+            result['genres'] = _records(aggregates['top_genres'].head(TOP_N), 'genre', 'count')
+        elif endpoint == 'directors':
+            aggregates = self.dataset.aggregates("Director Analysis", rows, director, search)
+            result['total'] = aggregates['total']
+            if director is None:
+                result['directors'] = _records(aggregates['director_counts'].head(TOP_N), 'director', 'movies')
+            else:
+                result['directors'] = [{'director': director, 'movies': aggregates['total']}] if aggregates['total'] else []
+        elif endpoint == 'actors':
+            result['total'] = self.dataset.count(rows)
+            result['actors'] = _records(self.dataset.top_actors(rows, TOP_N), 'actor', 'movies')
+        return result
+
+
+class AggregateServer:
+    def __init__(self, dataset, loader=None, filepath=None, cache_entries=CACHE_ENTRIES):
+        self.service = AggregateService(dataset)
+        self.loader = loader
+        self.filepath = filepath
+        self.cache = AggregateCache(cache_entries)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.in_flight = {}
+        self.watch_task = None
+        self.watch_error = None
+        self.requests = 0
+        self.started = time.time()
+
+    def encode(self, endpoint, filters):
+        return json.dumps(self.service.compute(endpoint, filters)).encode()
+
+    async def aggregate(self, endpoint, query):
+        filters = self.service.filters(query)
+        key = (endpoint, filters, self.service.dataset.fingerprint)
+        body = self.cache.get(key)
+        if body is not None:
+            return body
+
+        # Identical requests arriving while this one is computed wait for the same result
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self.encode, endpoint, filters)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self.finish(key, done))
+        return await asyncio.shield(future)
+
+    def finish(self, key, future):
+        del self.in_flight[key]
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+
+    def info(self):
+        dataset = self.service.dataset
+        return json.dumps({
+            'movies': len(dataset),
+            'years': list(self.service.year_range),
+            'directors': len(dataset.director_names),
+            'fingerprint': dataset.fingerprint,
+            'source_offset': dataset.source_offset,
+            'watch_error': self.watch_error,
+            'endpoints': [f"/api/{endpoint}" for endpoint in ENDPOINTS],
+            'requests': self.requests,
+            'cache': {'entries': len(self.cache.entries), 'hits': self.cache.hits, 'misses': self.cache.misses},
+            'uptime_s': round(time.time() - self.started, 1),
+        }).encode()
+
+    async def dispatch(self, method, target):
+        # (status, JSON body) for one request
+        path, query = urlsplit(target)[2:4]
+        if method != 'GET':
+            return HTTPStatus.METHOD_NOT_ALLOWED, _error("Only GET is supported")
+        if path == '/api/health':
+            return HTTPStatus.OK, b'{"status": "ok"}'
+        if path == '/api/info':
+            return HTTPStatus.OK, self.info()
+
+        endpoint = path[len('/api/'):] if path.startswith('/api/') else None
+        if endpoint not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, _error(f"Unknown endpoint: {path}")
+        try:
+            return HTTPStatus.OK, await self.aggregate(endpoint, query)
+        except BadRequest as e:
+            return HTTPStatus.BAD_REQUEST, _error(str(e))
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, _error(f"{type(e).__name__}: {e}")
+
+    async def handle_connection(self, reader, writer):
+        # HTTP/1.1 with keep-alive: requests on one connection are answered in order
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode('latin-1').split()
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+                    status, body, keep_alive = HTTPStatus.BAD_REQUEST, _error("Malformed request line"), False
+                else:
+                    method, target, version = parts
+                    status, body = await self.dispatch(method, target)
+                    # Request bodies are never read, so a request with one ends the connection
+                    keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                                  and method == 'GET' and 'content-length' not in headers)
+                self.requests += 1
+
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def watch(self, interval):
+        # Pick up rows appended to the CSV, as the dashboard's "Watch file" does. The new
+        # fingerprint retires every cached response; a rewritten file is loaded again. A
+        # failed check (say a half-written quoted field) is retried on the next tick. Rows
+        # after the failing bytes cannot be read until they are fixed, so the failure is
+        # kept in /api/info (with the offset reading is stuck at) until a check succeeds.
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            previous = dataset = self.service.dataset
+            try:
+                try:
+                    added = await loop.run_in_executor(self.executor, dataset.append_from_source)
+                except SourceRewritten:
+                    dataset = await loop.run_in_executor(self.executor, self.loader, self.filepath)
+                    added = len(dataset)
+            except Exception as e:
+                error = {'error': f"{type(e).__name__}: {e}", 'offset': dataset.source_offset}
+                if self.watch_error is None or self.watch_error['error'] != error['error']:
+                    print(f"Could not read new rows from {self.filepath} after byte {error['offset']}: "
+                          f"{error['error']}")
+                    self.watch_error = dict(error, since=round(time.time(), 1))
+                continue
+            if self.watch_error is not None:
+                print(f"Reading new rows from {self.filepath} again")
+                self.watch_error = None
+            if not added and dataset is previous:
+                continue
+
+            self.service = AggregateService(dataset)
+            self.cache.clear()
+            if dataset is previous:
+                print(f"Loaded {added} new movies ({len(dataset)} total)")
+            else:
+                print(f"{self.filepath} was rewritten; loaded {len(dataset)} movies")
+                # Queries already queued on the single worker thread finish before the close
+                loop.run_in_executor(self.executor, previous.close)
+
+    async def serve(self, host, port, watch_interval=None):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving {len(self.service.dataset)} movies on http://{address[0]}:{address[1]}", flush=True)
+        if watch_interval:
+            self.watch_task = asyncio.get_running_loop().create_task(self.watch(watch_interval))
+        async with server:
+            await server.serve_forever()
+
+
+def _error(message):
+    return json.dumps({'error': message}).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the dashboard's aggregates as a local JSON API")
+    parser.add_argument('csv', help="Movies CSV file")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on (0 picks a free one)")
+    parser.add_argument('--backend', default='memory', choices=sorted(BACKENDS),
+                        help="Keep the data in memory or in an on-disk SQLite database")
+    parser.add_argument('--cache-entries', type=int, default=CACHE_ENTRIES, help="Responses kept in the cache")
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help="Check the CSV for appended rows this often")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    loader = BACKENDS[args.backend]
+    dataset = loader(args.csv)
+    print(f"Loaded {len(dataset)} movies in {time.perf_counter() - start:.2f}s")
+
+    server = AggregateServer(dataset, loader, args.csv, args.cache_entries)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.watch))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from movie_data import load_dataset
+from sqlite_backend import load_sqlite_dataset
+
+# Data backends by name. Each loader takes (filepath, progress, cancel_event, use_cache,
+# stage) and returns a dataset with the same query interface: select(), aggregates(),
+# count(), top_actors(), year_range(), directors_with_min_movies(),
+# director_names/director_movie_counts, fingerprint, memory_summary(), close(),
+# release_reader() and the append_* methods.
+BACKENDS = {
+    'memory': load_dataset,
+    'sqlite': load_sqlite_dataset,
+}
+
+# Names shown in the dashboard
+BACKEND_LABELS = {
+    'memory': "In memory",
+    'sqlite': "On disk (SQLite)",
+}
@@ -0,0 +1,114 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import charts
+from backends import BACKENDS
+from movie_data import CHART_TYPES
+
+# Headless export of every dashboard chart for a grid of year ranges x directors.
+# Charts are rendered off-screen with the Agg canvas, so no display is needed.
+#
+#   python batch_render.py IMDB-Movie-Dataset.csv --out report --decades --top-directors 5
+
+# Per-worker state: each process loads the dataset once and reuses a single figure
+_dataset = None
+_figure = None
+
+
+def init_worker(filepath, backend):
+    global _dataset, _figure
+    _dataset = BACKENDS[backend](filepath)
+    _figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(_figure)
+
+
+def slugify(text):
+    return re.sub(r'[^A-Za-z0-9]+', '-', text).strip('-').lower()
+
+
+def render_job(job):
+    chart_type, year_min, year_max, director, out_dir, formats = job
+    rows = _dataset.select(year_min, year_max, director)
+    aggregates = _dataset.aggregates(chart_type, rows, director)
+
+    _figure.clear()
+    if not charts.draw_chart(_figure, chart_type, aggregates, director):
+        return 0
+
+    name = f"{slugify(chart_type)}_{year_min}-{year_max}_{slugify(director or 'all-directors')}"
+    for fmt in formats:
+        _figure.savefig(os.path.join(out_dir, f"{name}.{fmt}"), format=fmt)
+    return 1
+
+
+def parse_year_ranges(text):
+    ranges = []
+    for part in text.split(','):
+        start, end = part.split('-')
+        ranges.append((int(start), int(end)))
+    return ranges
+
+
+def build_jobs(dataset, args):
+    first_year, last_year = dataset.year_range()
+
+    year_ranges = [(first_year, last_year)]
+    if args.year_ranges:
+        year_ranges = parse_year_ranges(args.year_ranges)
+    elif args.decades:
+        year_ranges += [(decade, decade + 9) for decade in range(first_year // 10 * 10, last_year + 1, 10)]
+
+    directors = [None] + (args.director or [])
+    if args.top_directors:
+        by_count = dataset.director_names[(-dataset.director_movie_counts).argsort(kind='stable')]
+        directors += [name for name in by_count[:args.top_directors] if name not in directors]
+
+    formats = args.formats.split(',')
+    return [(chart_type, year_min, year_max, director, args.out, formats)
+            for chart_type in args.charts
+            for year_min, year_max in year_ranges
+            for director in directors]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render dashboard charts to image files without a display")
+    parser.add_argument('csv', help="Movies CSV file")
+    parser.add_argument('--out', default='charts_out', help="Output directory")
+    parser.add_argument('--formats', default='png', help="Comma separated image formats, e.g. png,svg")
+    parser.add_argument('--charts', nargs='+', default=CHART_TYPES, choices=CHART_TYPES, metavar='CHART',
+                        help="Charts to render (default: all)")
+    parser.add_argument('--year-ranges', help="Comma separated year ranges, e.g. 1990-1999,2000-2009")
+    parser.add_argument('--decades', action='store_true', help="Also render every decade in the data")
+    parser.add_argument('--director', action='append', help="Director to render (repeatable)")
+    parser.add_argument('--top-directors', type=int, default=0, help="Also render the N most prolific directors")
+    parser.add_argument('--backend', default='memory', choices=sorted(BACKENDS),
+                        help="Data backend; 'sqlite' keeps the catalogue in an on-disk database")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+
+    # Loading here first also writes the dataset cache (or database) the workers then start from
+    start = time.perf_counter()
+    dataset = BACKENDS[args.backend](args.csv)
+    jobs = build_jobs(dataset, args)
+    print(f"Loaded {len(dataset)} movies in {time.perf_counter() - start:.2f}s; rendering {len(jobs)} charts "
+          f"with {args.workers} workers")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(args.csv, args.backend)) as pool:
+        rendered = sum(pool.map(render_job, jobs, chunksize=max(1, len(jobs) // (4 * args.workers))))
+    elapsed = time.perf_counter() - start
+
+    print(f"Rendered {rendered} charts ({len(jobs) - rendered} skipped with no data) in {elapsed:.2f}s "
+          f"= {rendered / elapsed:.1f} charts/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+
+from run import environment
+
+# Load test for api_server.py: keep-alive clients send GET requests concurrently against
+# a running server and report latency percentiles and throughput. --distinct sets how
+# many different queries the requests cycle through, and so how often the server's
+# response cache can answer.
+#
+#   python api_server.py movies.csv &
+#   python benchmarks/load_test.py --connections 32 --requests 5000 --distinct 200
+#
+#   python benchmarks/load_test.py --serve movies.csv --backend sqlite --output load.json
+
+DEFAULT_URL = 'http://127.0.0.1:8050'
+
+ENDPOINTS = ['years', 'genres', 'directors', 'actors']
+
+# Seconds to wait for a server started with --serve to load its data
+SERVE_TIMEOUT = 600
+
+
+class Client:
+    # One keep-alive HTTP/1.1 connection
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def get(self, target):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {target} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode('latin-1'))
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def query_mix(info, directors, distinct, seed):
+    # `distinct` request targets spread over the endpoints, year ranges and directors
+    first, last = info['years']
+    rng = random.Random(seed)
+    targets = []
+    for i in range(distinct):
+        year_min = rng.randint(first, last)
+        params = {'year_min': year_min, 'year_max': rng.randint(year_min, last)}
+        if directors and i % 4 == 3:
+            params['director'] = rng.choice(directors)
+        targets.append(f"/api/{ENDPOINTS[i % len(ENDPOINTS)]}?{urlencode(params)}")
+    return targets
+
+
+async def run_load(host, port, connections, requests, distinct, seed):
+    setup = Client(host, port)
+    _, body = await setup.get('/api/info')
+    info = json.loads(body)
+    _, body = await setup.get('/api/directors')
+    directors = [entry['director'] for entry in json.loads(body)['directors']]
+
+    targets = query_mix(info, directors, distinct, seed)
+    order = random.Random(seed + 1).choices(range(len(targets)), k=requests)
+    latencies = []
+    errors = []
+    next_request = iter(order)
+
+    async def worker():
+        client = Client(host, port)
+        try:
+            for index in next_request:
+                start = time.perf_counter()
+                try:
+                    status, _ = await client.get(targets[index])
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+                    client.close()
+                    continue
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(f"HTTP {status} for {targets[index]}")
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    _, body = await setup.get('/api/info')
+    setup.close()
+    return latencies, errors, elapsed, json.loads(body)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def start_server(csv_path, backend):
+    # Run api_server.py on a free port; returns (process, host, port) once it is listening
+    server_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_server.py')
+    process = subprocess.Popen([sys.executable, server_script, csv_path, '--port', '0', '--backend', backend],
+                               stdout=subprocess.PIPE, text=True)
+    deadline = time.time() + SERVE_TIMEOUT
+    for line in process.stdout:
+        print(line.rstrip())
+        match = re.search(r'http://([^:]+):(\d+)', line)
+        if match:
+            return process, match.group(1), int(match.group(2))
+        if time.time() > deadline:
+            break
+    process.kill()
+    raise RuntimeError(f"api_server.py did not start serving {csv_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure api_server.py latency and throughput")
+    parser.add_argument('--url', default=DEFAULT_URL, help="Server to test")
+    parser.add_argument('--serve', metavar='CSV', help="Start api_server.py on this CSV instead of using --url")
+    parser.add_argument('--backend', default='memory', help="Backend for the server started by --serve")
+    parser.add_argument('--connections', type=int, default=16, help="Concurrent keep-alive connections")
+    parser.add_argument('--requests', type=int, default=2000, help="Total requests to send")
+    parser.add_argument('--distinct', type=int, default=100,
+                        help="Different queries the requests are drawn from (fewer means more cache hits)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the query mix")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    process = None
+    if args.serve:
+        process, host, port = start_server(args.serve, args.backend)
+    else:
+        address = urlsplit(args.url)
+        host, port = address.hostname, address.port or 80
+
+    try:
+        latencies, errors, elapsed, info = asyncio.run(
+            run_load(host, port, args.connections, args.requests, args.distinct, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies.sort()
+    result = {
+        'requests': args.requests,
+        'connections': args.connections,
+        'distinct': args.distinct,
+        'errors': len(errors),
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_s': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p90_ms': round(percentile(latencies, 0.90) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        'server': {'movies': info['movies'], 'cache': info['cache']},
+    }
+
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.2f}s "
+          f"({result['requests_per_s']} req/s), {len(errors)} errors")
+    print(f"latency p50 {result['p50_ms']} ms  p90 {result['p90_ms']} ms  p99 {result['p99_ms']} ms  "
+          f"max {result['max_ms']} ms")
+    cache = info['cache']
+    print(f"server cache: {cache['hits']} hits, {cache['misses']} misses, {cache['entries']} entries")
+    for error in errors[:5]:
+        print(f"  {error}")
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({'environment': environment(), 'result': result}, handle, indent=2)
+        print(f"Wrote results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import charts
+import dataset_cache
+from movie_data import CHART_TYPES, load_dataset
+from synthetic import write_catalogue
+
+# Times the dashboard's hot paths on synthetic catalogues: CSV load (cold and from the
+# dataset cache), each filter, each chart aggregate and each chart render (off-screen, Agg).
+# Results are written as JSON so runs from different commits can be compared.
+#
+#   python benchmarks/run.py --sizes 2000 200000 --output bench.json
+
+DEFAULT_SIZES = [2_000, 20_000, 200_000]
+
+# Redraws in the memory check, and how many of them warm up caches before the baseline
+REDRAWS = 48
+WARMUP_REDRAWS = 8
+
+
+def measure(fn, repeat):
+    # Median and best wall time over `repeat` calls, plus the last return value
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(times), 'best_s': min(times), 'repeat': repeat}, result
+
+
+def filter_cases(dataset):
+    years = dataset.filters.sorted_years
+    first, last = int(years[0]), int(years[-1])
+    counts = dataset.director_movie_counts
+    top_director = dataset.director_names[counts.argmax()]
+    return {
+        'all_years': (first, last, None),
+        'one_decade': (last - 9, last, None),
+        'one_year': (last, last, None),
+        'director': (first, last, top_director),
+        'director_decade': (last - 9, last, top_director),
+    }
+
+
+def benchmark_size(n_rows, workdir, repeat, results):
+    filepath = os.path.join(workdir, f'synthetic_{n_rows}.csv')
+    if not os.path.exists(filepath):
+        write_catalogue(n_rows, filepath)
+    size_mb = os.path.getsize(filepath) / 1e6
+
+    def record(stage, name, timing, **extra):
+        results.append({'rows': n_rows, 'csv_mb': round(size_mb, 2), 'stage': stage, 'name': name, **timing, **extra})
+        print(f"{n_rows:>9} rows  {stage:<9} {name:<28} median {timing['median_s'] * 1000:10.2f} ms")
+
+    # Loading: a full parse, then from the sidecar cache (written by the first cached load)
+    timing, dataset = measure(lambda: load_dataset(filepath, use_cache=False), 1)
+    record('load', 'csv', timing, memory_mb=round(dataset.df.memory_usage(deep=True).sum() / 1e6, 2))
+    if dataset_cache.cache_available():
+        load_dataset(filepath)
+        timing, _ = measure(lambda: load_dataset(filepath), repeat)
+        record('load', 'cache', timing)
+
+    cases = filter_cases(dataset)
+    for name, (year_min, year_max, director) in cases.items():
+        timing, rows = measure(lambda: dataset.select(year_min, year_max, director), repeat)
+        record('filter', name, timing, result_rows=len(rows))
+
+    figure = Figure(figsize=(10, 6))
+    canvas = FigureCanvasAgg(figure)
+    for case in ['all_years', 'director']:
+        year_min, year_max, director = cases[case]
+        rows = dataset.select(year_min, year_max, director)
+        for chart_type in CHART_TYPES:
+            timing, aggregates = measure(lambda: dataset.aggregates(chart_type, rows, director), repeat)
+            record('aggregate', f'{chart_type} [{case}]', timing)
+
+            def render():
+                figure.clear()
+                charts.draw_chart(figure, chart_type, aggregates, director)
+                canvas.draw()
+            timing, _ = measure(render, repeat)
+            record('render', f'{chart_type} [{case}]', timing)
+
+    # Memory growth over repeated redraws on the shared figure; should stay flat
+    # (tracemalloc slows matplotlib down a lot, so this loop is kept short)
+    rows = dataset.select(*cases['all_years'])
+    all_aggregates = [dataset.aggregates(chart_type, rows) for chart_type in CHART_TYPES]
+    tracemalloc.start()
+    baseline = None
+    for i in range(REDRAWS):
+        figure.clear()
+        charts.draw_chart(figure, CHART_TYPES[i % len(CHART_TYPES)], all_aggregates[i % len(CHART_TYPES)])
+        canvas.draw()
+        if i == WARMUP_REDRAWS - 1:
+            baseline = tracemalloc.get_traced_memory()[0]
+    growth = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    name = f'memory growth over {REDRAWS - WARMUP_REDRAWS} redraws'
+    results.append({'rows': n_rows, 'stage': 'render', 'name': name, 'growth_kb': round(growth / 1024, 1)})
+    print(f"{n_rows:>9} rows  render    {name}: {growth / 1024:.1f} KiB")
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark load, filter, aggregate and render paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Catalogue sizes in rows (e.g. 2000 200000 5000000)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed repetitions per measurement")
+    parser.add_argument('--workdir', help="Directory for generated CSVs (kept between runs)")
+    parser.add_argument('--output', default='bench_results.json', help="JSON results file")
+    args = parser.parse_args()
+
+    workdir = args.workdir or os.path.join(tempfile.gettempdir(), 'bollywood_bench')
+    os.makedirs(workdir, exist_ok=True)
+
+    results = []
+    for n_rows in args.sizes:
+        benchmark_size(n_rows, workdir, args.repeat, results)
+
+    with open(args.output, 'w') as handle:
+        json.dump({'environment': environment(), 'results': results}, handle, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
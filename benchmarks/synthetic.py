@@ -0,0 +1,129 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Synthetic Bollywood-style catalogue with the same columns as IMDB-Movie-Dataset.csv.
+# Cardinalities follow the real file: ~25 genres with 1-3 per movie, roughly one director
+# per 8 movies and one actor per 5 movies, with Zipf-like popularity so a few directors and
+# stars dominate. A small share of years is missing or junk, as in the real export.
+#
+#   python benchmarks/synthetic.py 200000 synthetic_200k.csv
+
+GENRES = ['Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Drama', 'Family',
+          'Fantasy', 'History', 'Horror', 'Music', 'Musical', 'Mystery', 'Romance', 'Sci-Fi',
+          'Sport', 'Thriller', 'War', 'Western', 'Documentary', 'Short', 'Reality-TV', 'News', 'Film-Noir']
+
+FIRST_NAMES = ['Aamir', 'Abhay', 'Aditi', 'Ajay', 'Akshay', 'Alia', 'Amit', 'Anil', 'Anjali', 'Anupam',
+               'Arjun', 'Ayesha', 'Deepika', 'Farhan', 'Govinda', 'Hrithik', 'Juhi', 'Kajol', 'Kareena',
+               'Karan', 'Kiara', 'Madhuri', 'Manoj', 'Nana', 'Neha', 'Pankaj', 'Paresh', 'Priyanka',
+               'Rajkummar', 'Ranbir', 'Rani', 'Ravi', 'Rekha', 'Rishi', 'Saif', 'Salman', 'Sanjay',
+               'Shabana', 'Shahid', 'Shraddha', 'Sonam', 'Sunil', 'Tabu', 'Varun', 'Vidya', 'Vikram']
+
+LAST_NAMES = ['Kapoor', 'Khan', 'Kumar', 'Bachchan', 'Devgn', 'Dutt', 'Chopra', 'Rawal', 'Kher',
+              'Shroff', 'Mukerji', 'Sharma', 'Verma', 'Singh', 'Rao', 'Patel', 'Joshi', 'Mehta',
+              'Bhatt', 'Johar', 'Kashyap', 'Akhtar', 'Shetty', 'Ghosh', 'Banerjee', 'Reddy', 'Nair',
+              'Menon', 'Iyer', 'Desai', 'Malhotra', 'Saxena', 'Tripathi', 'Bajpayee', 'Sinha']
+
+OVERVIEW_WORDS = ['a', 'young', 'man', 'woman', 'family', 'love', 'story', 'village', 'city', 'police',
+                  'officer', 'gangster', 'journey', 'revenge', 'friendship', 'wedding', 'secret', 'war',
+                  'thief', 'brothers', 'sisters', 'mumbai', 'delhi', 'dream', 'cricket', 'music', 'past',
+                  'mystery', 'murder', 'politician', 'farmer', 'soldier', 'heist', 'comedy', 'of', 'errors',
+                  'the', 'and', 'in', 'to', 'who', 'must', 'save', 'find', 'fight', 'against', 'corrupt']
+
+CSV_CHUNK_ROWS = 250_000
+
+
+def person_names(count, salt):
+    # Deterministic, mostly unique "First Last" names, with a numeric suffix once the
+    # first/last combinations run out
+    i = np.arange(count) + salt
+    first = np.asarray(FIRST_NAMES, dtype=object)[i % len(FIRST_NAMES)]
+    last = np.asarray(LAST_NAMES, dtype=object)[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    names = first + ' ' + last
+    repeat = i // (len(FIRST_NAMES) * len(LAST_NAMES))
+    suffix = np.where(repeat > 0, ' ' + repeat.astype(str).astype(object), '')
+    return names + suffix
+
+
+def zipf_choice(rng, n_items, size, exponent):
+    # Popularity-skewed picks in [0, n_items)
+    ranks = np.arange(1, n_items + 1, dtype=np.float64)
+    weights = ranks ** -exponent
+    return rng.choice(n_items, size=size, p=weights / weights.sum())
+
+
+def zipf_distinct(rng, n_items, count, k, exponent):
+    # `count` rows of k different popularity-skewed picks, drawn one column at a time: a
+    # pick repeating an earlier one in its row is drawn again, as when drawing without
+    # replacement
+    picks = zipf_choice(rng, n_items, (count, k), exponent)
+    for j in range(1, k):
+        while True:
+            repeated = (picks[:, :j] == picks[:, j:j + 1]).any(axis=1)
+            if not repeated.any():
+                break
+            picks[repeated, j] = zipf_choice(rng, n_items, int(repeated.sum()), exponent)
+    return picks
+
+
+def join_lists(values, lengths, sep=', '):
+    # Join each row of a (movies x max_len) string matrix, keeping the first `lengths` items
+    joined = values[:, 0].copy()
+    for k in range(1, values.shape[1]):
+        joined = np.where(k < lengths, joined + sep + values[:, k], joined)
+    return joined
+
+
+def generate_chunk(rng, start, count, directors, actors):
+    # Years skew towards recent releases; ~3% are missing or junk strings
+    years = (2025 - np.minimum(rng.exponential(18, count), 75)).astype(int).astype(object)
+    junk = rng.random(count)
+    years[junk < 0.02] = np.nan
+    years[(junk >= 0.02) & (junk < 0.03)] = 'X2020'
+
+    # A movie never lists the same genre or actor twice, as in the real file
+    genres = np.asarray(GENRES, dtype=object)[zipf_distinct(rng, len(GENRES), count, 3, 0.9)]
+    cast = actors[zipf_distinct(rng, len(actors), count, 5, 0.6)]
+    overview = np.asarray(OVERVIEW_WORDS, dtype=object)[rng.integers(0, len(OVERVIEW_WORDS), (count, 19))]
+
+    ids = np.arange(start, start + count).astype(str).astype(object)
+    return pd.DataFrame({
+        'S.NO': np.arange(start, start + count),
+        'movie_id': 'tt' + pd.Series(ids).str.zfill(8).to_numpy(dtype=object),
+        'movie_name': 'Movie ' + ids,
+        'year': years,
+        'genre': join_lists(genres, rng.integers(1, 4, count)),
+        'overview': join_lists(overview, rng.integers(8, 20, count), ' '),
+        'director': directors[zipf_choice(rng, len(directors), count, 0.6)],
+        'cast': join_lists(cast, rng.integers(3, 6, count)),
+    })
+
+
+def write_catalogue(n_rows, filepath, seed=0):
+    rng = np.random.default_rng(seed)
+    directors = person_names(max(10, n_rows // 8), salt=7)
+    actors = person_names(max(50, n_rows // 5), salt=0)
+
+    with open(filepath, 'w', newline='') as handle:
+        for start in range(0, n_rows, CSV_CHUNK_ROWS):
+            count = min(CSV_CHUNK_ROWS, n_rows - start)
+            chunk = generate_chunk(rng, start, count, directors, actors)
+            chunk.to_csv(handle, index=False, header=(start == 0))
+    return filepath
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Bollywood movies CSV")
+    parser.add_argument('rows', type=int, help="Number of movies")
+    parser.add_argument('output', help="CSV file to write")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    write_catalogue(args.rows, args.output, args.seed)
+    print(f"Wrote {args.rows} movies to {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
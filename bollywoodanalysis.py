@@ -1,11 +1,49 @@
+import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-import matplotlib.pyplot as plt
+import threading
+import queue
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import seaborn as sns
-from collections import Counter
-import re
+import charts
+from profiling import DISABLED_RUN, StageProfiler
+from virtual_table import VirtualTable
+from backends import BACKENDS, BACKEND_LABELS
+from movie_data import CHART_TYPES, AggregateCache, LoadCancelled, MissingColumnsError, SourceRewritten
+
+# Quiet period before a burst of slider ticks or clicks is acted on
+CHART_UPDATE_DELAY_MS = 80
+DIRECTOR_LIST_DELAY_MS = 150
+SEARCH_DELAY_MS = 150
+
+# Titles offered in the search box's type-ahead list
+SEARCH_SUGGESTIONS = 10
+
+# How often a watched CSV is checked for appended rows
+WATCH_INTERVAL_MS = 2000
+
+class UpdateScheduler:
+    # Debounces rapid UI events into one call on the Tk event loop. Each schedule() replaces
+    # any call still waiting, so only the latest state is ever rendered.
+    def __init__(self, root, delay_ms, callback):
+        self.root = root
+        self.delay_ms = delay_ms
+        self.callback = callback
+        self.pending = None
+    
+    def schedule(self, *args):
+        self.cancel()
+        self.pending = self.root.after(self.delay_ms, self.run)
+    
+    def cancel(self):
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+            self.pending = None
+    
+    def run(self):
+        self.pending = None
+        self.callback()
 
 class BollywoodDashboard:
     def __init__(self, root):
@@ -14,11 +52,27 @@ class BollywoodDashboard:
         self.root.geometry("1200x700")
         self.root.configure(bg="#f0f0f0")
         
-        self.df = None
+        self.data = None
+        self.aggregate_cache = AggregateCache()
+        self.load_thread = None
+        self.load_cancel = None
+        self.load_queue = None
+        self.query_thread = None
+        self.query_dataset = None
+        self.query_queue = None
+        self.profiler = StageProfiler()
+        self.current_run = DISABLED_RUN
+        self.diagnostics_window = None
+        self.chart_scheduler = UpdateScheduler(self.root, CHART_UPDATE_DELAY_MS, self.update_chart)
+        self.director_list_scheduler = UpdateScheduler(self.root, DIRECTOR_LIST_DELAY_MS, self.update_director_list)
+        self.search_scheduler = UpdateScheduler(self.root, SEARCH_DELAY_MS, self.update_search)
+        self.watch_job = None
+        self.year_bounds = None
         self.year_min = tk.IntVar(value=1950)
         self.year_max = tk.IntVar(value=2025)
         self.min_movies = tk.IntVar(value=1)  # Minimum number of movies by director
         self.selected_director = tk.StringVar(value="All Directors")  # Selected director
+        self.search_var = tk.StringVar(value="")  # Words to find in titles and overviews
         self.setup_ui()
     
     def setup_ui(self):
@@ -38,8 +92,55 @@ class BollywoodDashboard:
         left_panel.pack(side=tk.LEFT, fill=tk.Y, padx=5, pady=5)
         
         # Load data button
-        tk.Button(left_panel, text="Load CSV File", command=self.load_csv,
-                 bg="#138808", fg="white", font=("Arial", 12), padx=10, pady=5).pack(pady=10)
+        self.load_button = tk.Button(left_panel, text="Load CSV File", command=self.load_csv,
+                                     bg="#138808", fg="white", font=("Arial", 12), padx=10, pady=5)
+        self.load_button.pack(pady=10)
+        
+        # Where the loaded data lives: in memory, or an on-disk database for huge catalogues
+        backend_frame = tk.Frame(left_panel, bg="#f0f0f0")
+        backend_frame.pack(fill=tk.X, pady=(0, 10))
+        tk.Label(backend_frame, text="Backend:", bg="#f0f0f0").pack(side=tk.LEFT, padx=5)
+        self.backend_var = tk.StringVar(value=BACKEND_LABELS['memory'])
+        ttk.Combobox(backend_frame, textvariable=self.backend_var, values=list(BACKEND_LABELS.values()),
+                     state='readonly', width=16).pack(side=tk.LEFT)
+        
+        # Load progress (only shown while a file is loading)
+        self.load_progress_frame = tk.Frame(left_panel, bg="#f0f0f0")
+        self.load_progress = ttk.Progressbar(self.load_progress_frame, orient=tk.HORIZONTAL,
+                                             mode='determinate', maximum=100, length=120)
+        self.load_progress.pack(side=tk.LEFT, padx=5)
+        tk.Button(self.load_progress_frame, text="Cancel", command=self.cancel_load,
+                 font=("Arial", 9)).pack(side=tk.LEFT)
+        
+        # Incremental refresh: pick up rows appended to the loaded file or from a delta file
+        refresh_frame = tk.LabelFrame(left_panel, text="New Rows", bg="#f0f0f0", font=("Arial", 12))
+        refresh_frame.pack(pady=10, fill=tk.X)
+        
+        tk.Button(refresh_frame, text="Check File for New Rows", command=self.refresh_from_source,
+                 font=("Arial", 10)).pack(fill=tk.X, padx=5, pady=(5, 2))
+        tk.Button(refresh_frame, text="Append Delta File...", command=self.append_delta_file,
+                 font=("Arial", 10)).pack(fill=tk.X, padx=5, pady=2)
+        self.watch_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(refresh_frame, text="Watch file", variable=self.watch_var,
+                      bg="#f0f0f0", command=self.toggle_watch).pack(anchor=tk.W, padx=5)
+        
+        # Search box: matching movies feed the year/director filters and every chart
+        search_frame = tk.LabelFrame(left_panel, text="Search Titles & Plots", bg="#f0f0f0", font=("Arial", 12))
+        search_frame.pack(pady=10, fill=tk.X)
+        
+        self.search_box = ttk.Combobox(search_frame, textvariable=self.search_var, width=22)
+        self.search_box.pack(fill=tk.X, padx=5, pady=(5, 2))
+        self.search_box.bind("<KeyRelease>", self.search_scheduler.schedule)
+        self.search_box.bind("<Return>", self.chart_scheduler.schedule)
+        self.search_box.bind("<<ComboboxSelected>>", self.select_suggestion)
+        
+        search_buttons = tk.Frame(search_frame, bg="#f0f0f0")
+        search_buttons.pack(fill=tk.X, padx=5, pady=(0, 5))
+        self.search_info_var = tk.StringVar(value="")
+        tk.Label(search_buttons, textvariable=self.search_info_var, bg="#f0f0f0",
+                font=("Arial", 9)).pack(side=tk.LEFT)
+        tk.Button(search_buttons, text="Clear", command=self.clear_search,
+                 font=("Arial", 9)).pack(side=tk.RIGHT)
         
         # Year range selector
         year_frame = tk.LabelFrame(left_panel, text="Year Range", bg="#f0f0f0", font=("Arial", 12))
@@ -56,8 +157,12 @@ class BollywoodDashboard:
         self.year_max_dropdown = ttk.Combobox(year_frame, values=year_max_values, textvariable=self.year_max, width=6)
         self.year_max_dropdown.grid(row=1, column=1, padx=5, pady=5)
         
+        # Redraw shortly after a year is picked; repeated picks collapse into one redraw
+        self.year_min_dropdown.bind("<<ComboboxSelected>>", self.chart_scheduler.schedule)
+        self.year_max_dropdown.bind("<<ComboboxSelected>>", self.chart_scheduler.schedule)
+        
         # Apply button for year range
-        tk.Button(year_frame, text="Apply Filter", command=self.update_chart,
+        tk.Button(year_frame, text="Apply Filter", command=self.chart_scheduler.schedule,
                  bg="#FF9933", fg="white", font=("Arial", 10)).grid(row=2, column=0, columnspan=2, pady=10)
         
         # Director selection frame
@@ -67,36 +172,51 @@ class BollywoodDashboard:
         # Minimum movies slider
         tk.Label(director_frame, text="Min. Movies:", bg="#f0f0f0").grid(row=0, column=0, padx=5, pady=5)
         self.min_movies_slider = tk.Scale(director_frame, from_=1, to=10, orient=tk.HORIZONTAL, 
-                                          variable=self.min_movies, command=self.update_director_list)
+                                          variable=self.min_movies, command=self.director_list_scheduler.schedule)
         self.min_movies_slider.grid(row=0, column=1, padx=5, pady=5)
         
         # Director dropdown
         tk.Label(director_frame, text="Select Director:", bg="#f0f0f0").grid(row=1, column=0, padx=5, pady=5)
         self.director_dropdown = ttk.Combobox(director_frame, textvariable=self.selected_director, width=15)
         self.director_dropdown.grid(row=1, column=1, padx=5, pady=5)
+        self.director_dropdown.bind("<<ComboboxSelected>>", self.chart_scheduler.schedule)
         
         # Apply button for director filter
-        tk.Button(director_frame, text="Apply Director Filter", command=self.update_chart,
+        tk.Button(director_frame, text="Apply Director Filter", command=self.chart_scheduler.schedule,
                  bg="#FF9933", fg="white", font=("Arial", 10)).grid(row=2, column=0, columnspan=2, pady=10)
         
         # Chart selection
         tk.Label(left_panel, text="Select Chart:", bg="#f0f0f0", font=("Arial", 12)).pack(pady=(20, 5))
         
-        charts = ["Movies by Year", "Genre Distribution", "Director Analysis", "Cast Network"]
-        
-        self.chart_var = tk.StringVar(value=charts[0])
-        for chart in charts:
+        self.chart_var = tk.StringVar(value=CHART_TYPES[0])
+        for chart in CHART_TYPES:
             tk.Radiobutton(left_panel, text=chart, variable=self.chart_var, value=chart,
-                          bg="#f0f0f0", font=("Arial", 11), command=self.update_chart).pack(anchor=tk.W, pady=5)
+                          bg="#f0f0f0", font=("Arial", 11), command=self.chart_scheduler.schedule).pack(anchor=tk.W, pady=5)
+        
+        # Opt-in instrumentation of loads and redraws
+        diagnostics_frame = tk.LabelFrame(left_panel, text="Diagnostics", bg="#f0f0f0", font=("Arial", 12))
+        diagnostics_frame.pack(pady=(20, 10), fill=tk.X)
+        
+        self.profiling_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(diagnostics_frame, text="Profile redraws", variable=self.profiling_var,
+                      bg="#f0f0f0", command=self.toggle_profiling).pack(anchor=tk.W, padx=5)
+        tk.Button(diagnostics_frame, text="Show Timings", command=self.open_diagnostics,
+                 font=("Arial", 10)).pack(pady=5)
         
         # Right panel for visualizations
         self.right_panel = tk.Frame(content_frame, bg="white", padx=10, pady=10)
         self.right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # One long-lived figure and canvas, cleared and redrawn for every chart
+        self.figure = Figure(figsize=(10, 6))
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.right_panel)
+        
+        # Frame below the chart for statistics, movie lists and messages
+        self.details_frame = tk.Frame(self.right_panel, bg="white")
+        self.details_frame.pack(fill=tk.BOTH)
+        
         # Message when no data is loaded
-        self.message_label = tk.Label(self.right_panel, text="Please load a CSV file to begin analysis", 
-                                    font=("Arial", 14), bg="white")
-        self.message_label.pack(expand=True)
+        self.show_message("Please load a CSV file to begin analysis")
         
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
@@ -104,6 +224,9 @@ class BollywoodDashboard:
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
     
     def load_csv(self):
+        if self.load_thread is not None:
+            return
+        
         filepath = filedialog.askopenfilename(
             title="Select Bollywood Movies CSV",
             filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
@@ -111,45 +234,107 @@ class BollywoodDashboard:
         
         if not filepath:
             return
-            
+        
+        self.start_load(filepath)
+    
+    def selected_backend(self):
+        for name, label in BACKEND_LABELS.items():
+            if label == self.backend_var.get():
+                return name
+        return 'memory'
+    
+    def start_load(self, filepath):
+        self.status_var.set("Loading data...")
+        self.load_progress['value'] = 0
+        self.load_progress_frame.pack(fill=tk.X, pady=(0, 10), after=self.load_button)
+        self.load_button.config(state=tk.DISABLED)
+        
+        # Parse on a worker thread; it only talks to the UI through the queue
+        self.load_cancel = threading.Event()
+        self.load_queue = queue.Queue()
+        self.load_thread = threading.Thread(target=self.load_worker,
+                                            args=(filepath, BACKENDS[self.selected_backend()],
+                                                  self.load_queue, self.load_cancel), daemon=True)
+        self.load_thread.start()
+        self.root.after(100, self.poll_load_queue)
+    
+    def load_worker(self, filepath, loader, results, cancel_event):
+        def report_progress(bytes_read, total_bytes):
+            results.put(("progress", bytes_read, total_bytes))
+        
         try:
-            self.status_var.set("Loading data...")
-            self.root.update()
+            run = self.profiler.start_run(f"Load {filepath}")
+            with run.stage('load'):
+                dataset = loader(filepath, report_progress, cancel_event, stage=run.stage)
+            self.profiler.finish_run(run)
+            results.put(("done", dataset))
+        except LoadCancelled:
+            results.put(("cancelled",))
+        except Exception as e:
+            results.put(("error", e))
+    
+    def cancel_load(self):
+        if self.load_cancel is not None:
+            self.load_cancel.set()
+            self.status_var.set("Cancelling load...")
+    
+    def poll_load_queue(self):
+        # Runs on the Tk thread via root.after until the worker reports a result
+        while True:
+            try:
+                message = self.load_queue.get_nowait()
+            except queue.Empty:
+                self.root.after(100, self.poll_load_queue)
+                return
             
-            self.df = pd.read_csv(filepath)
+            if message[0] == "progress":
+                _, bytes_read, total_bytes = message
+                percent = 100 * bytes_read / total_bytes if total_bytes else 100
+                self.load_progress['value'] = percent
+                self.status_var.set(f"Loading data... {bytes_read / 1e6:.1f} of {total_bytes / 1e6:.1f} MB")
+                continue
+            
+            self.finish_load()
+            if message[0] == "done":
+                self.apply_dataset(message[1])
+            elif message[0] == "cancelled":
+                self.status_var.set("Load cancelled")
+            elif isinstance(message[1], MissingColumnsError):
+                messagebox.showerror("Missing Columns", str(message[1]))
+                self.status_var.set("Error loading data")
+            else:
+                messagebox.showerror("Error", f"Failed to load CSV file: {str(message[1])}")
+                self.status_var.set("Error loading data")
+            return
+    
+    def finish_load(self):
+        self.load_thread = None
+        self.load_cancel = None
+        self.load_queue = None
+        self.load_progress_frame.pack_forget()
+        self.load_button.config(state=tk.NORMAL)
+    
+    def apply_dataset(self, dataset):
+        try:
+            # Genre/cast tables and the filter engine (or the database) were built on the worker thread
+            previous, self.data = self.data, dataset
             
-            # Check if required columns exist
-            required_columns = ['movie_id', 'movie_name', 'year', 'genre', 'director', 'cast']
-            missing_columns = [col for col in required_columns if col not in self.df.columns]
+            # A query still running on the previous dataset closes it when it finishes
+            if previous is not None and previous is not self.query_dataset:
+                previous.close()
             
-            if missing_columns:
-                messagebox.showerror("Missing Columns", 
-                                     f"The CSV file is missing these required columns: {', '.join(missing_columns)}")
-                self.df = None
-                self.status_var.set("Error loading data")
-                return
-                
-            # Clean data
-            if 'year' in self.df.columns:
-                self.df['year'] = pd.to_numeric(self.df['year'], errors='coerce')
+            # Aggregates computed from the previous file are no longer valid
+            self.aggregate_cache.clear()
             
             # Update year range dropdowns
-            if len(self.df) > 0:
-                min_year = int(self.df['year'].min())
-                max_year = int(self.df['year'].max())
-                
-                self.year_min.set(min_year)
-                self.year_max.set(max_year)
-                
-                year_range = list(range(min_year, max_year + 1))
-                self.year_min_dropdown['values'] = year_range
-                self.year_max_dropdown['values'] = year_range
+            self.year_bounds = None
+            self.update_year_range()
             
             # Initialize director dropdown
             self.update_director_list()
             
-            self.message_label.pack_forget()
-            self.status_var.set(f"Loaded {len(self.df)} movies")
+            source = " (from cache)" if dataset.loaded_from_cache else ""
+            self.status_var.set(f"Loaded {len(self.data)} movies{source} | {dataset.memory_summary()}")
             
             # Display first chart
             self.update_chart()
@@ -158,20 +343,120 @@ class BollywoodDashboard:
             messagebox.showerror("Error", f"Failed to load CSV file: {str(e)}")
             self.status_var.set("Error loading data")
     
+    def update_year_range(self):
+        year_range = self.data.year_range()
+        if year_range is None:
+            return
+        
+        old_bounds = self.year_bounds
+        min_year, max_year = year_range
+        self.year_bounds = year_range
+        
+        # A fresh load selects everything; after an append, a selection that reached the
+        # old bounds is widened so the new movies show up
+        if old_bounds is None or self.year_min.get() <= old_bounds[0]:
+            self.year_min.set(min_year)
+        if old_bounds is None or self.year_max.get() >= old_bounds[1]:
+            self.year_max.set(max_year)
+        
+        year_range = list(range(min_year, max_year + 1))
+        self.year_min_dropdown['values'] = year_range
+        self.year_max_dropdown['values'] = year_range
+    
+    def refresh_from_source(self, quiet=False):
+        # Read only the rows appended to the loaded file since it was last read; not while
+        # a background query is reading the database (the watch just tries again)
+        if self.data is None or self.load_thread is not None or self.query_thread is not None:
+            return
+        
+        try:
+            added = self.data.append_from_source()
+        except SourceRewritten:
+            self.status_var.set("The file was rewritten, loading it again...")
+            self.start_load(self.data.source_path)
+            return
+        except Exception as e:
+            # Rows after the failing bytes cannot be read until the file is fixed, so stop
+            # watching rather than failing on the same bytes every tick
+            self.stop_watch()
+            messagebox.showerror("Error", f"Failed to read new rows after byte {self.data.source_offset} "
+                                          f"of {self.data.source_path}: {str(e)}")
+            self.status_var.set("Error reading new rows")
+            return
+        
+        if added or not quiet:
+            self.apply_new_rows(added)
+    
+    def append_delta_file(self):
+        if self.data is None or self.load_thread is not None:
+            return
+        if self.query_thread is not None:
+            self.status_var.set("Wait for the current query to finish before appending rows")
+            return
+        
+        filepath = filedialog.askopenfilename(
+            title="Select CSV With New Movies",
+            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+        )
+        if not filepath:
+            return
+        
+        try:
+            added = self.data.append_csv(filepath)
+        except MissingColumnsError as e:
+            messagebox.showerror("Missing Columns", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to append rows: {str(e)}")
+            return
+        self.apply_new_rows(added)
+    
+    def apply_new_rows(self, added):
+        if not added:
+            self.status_var.set(f"No new rows | {len(self.data)} movies")
+            return
+        
+        # The dataset extended its indexes in place. Aggregates cached for the old rows
+        # can never be hit again (the fingerprint changed) and movie listings among them
+        # hold the previous table, so drop them all.
+        self.aggregate_cache.clear()
+        self.update_year_range()
+        self.update_director_list()
+        self.update_chart()
+        self.status_var.set(f"Appended {added} movies ({len(self.data)} total) | {self.status_var.get()}")
+    
+    def toggle_watch(self):
+        if self.watch_var.get():
+            self.status_var.set("Watching the loaded file for new rows")
+            self.watch_job = self.root.after(WATCH_INTERVAL_MS, self.poll_source)
+        else:
+            self.stop_watch()
+    
+    def stop_watch(self):
+        self.watch_var.set(False)
+        if self.watch_job is not None:
+            self.root.after_cancel(self.watch_job)
+            self.watch_job = None
+    
+    def poll_source(self):
+        # A stat() per tick; the file is only read when it has grown
+        self.watch_job = None
+        if self.data is not None and os.path.exists(self.data.source_path):
+            self.refresh_from_source(quiet=True)
+        if self.watch_var.get():
+            self.watch_job = self.root.after(WATCH_INTERVAL_MS, self.poll_source)
+    
     def update_director_list(self, *args):
-        if self.df is None:
+        if self.data is None:
             return
             
         try:
-            # Count movies by director
-            director_counts = self.df['director'].value_counts()
-            
-            # Filter by minimum number of movies
+            # Filter by minimum number of movies using the counts computed at load time
             min_movies = self.min_movies.get()
-            qualified_directors = director_counts[director_counts >= min_movies].index.tolist()
+            qualified_directors = self.data.directors_with_min_movies(min_movies)
             
             # Update dropdown values
-            director_values = ["All Directors"] + sorted(qualified_directors)
+            director_values = ["All Directors"] + qualified_directors
             self.director_dropdown['values'] = director_values
             
             # Reset to "All Directors" if current selection is not in the list
@@ -184,88 +469,274 @@ class BollywoodDashboard:
         except Exception as e:
             self.status_var.set(f"Error updating director list: {str(e)}")
     
+    def search_text(self):
+        # The current search, or "" when the box holds no words
+        text = self.search_var.get()
+        return text if text.strip() else ""
+    
+    def update_search(self):
+        # Type-ahead titles for what has been typed so far, then redraw with the matches
+        if self.data is None:
+            return
+        
+        text = self.search_text()
+        if text:
+            suggestions = self.data.suggest(text, SEARCH_SUGGESTIONS)
+            self.search_box['values'] = [f"{title} ({year})" if year is not None else title
+                                         for title, year in suggestions]
+        else:
+            self.search_box['values'] = []
+        self.chart_scheduler.schedule()
+    
+    def select_suggestion(self, event=None):
+        # Picking a title searches for that title (without the year shown after it)
+        selected = self.search_box.get()
+        title = selected.rsplit(" (", 1)[0] if selected.endswith(")") else selected
+        self.search_var.set(title + " ")
+        self.search_box.icursor(tk.END)
+        self.chart_scheduler.schedule()
+    
+    def clear_search(self):
+        self.search_var.set("")
+        self.search_box['values'] = []
+        self.chart_scheduler.schedule()
+    
+    def toggle_profiling(self):
+        if self.profiling_var.get():
+            self.profiler.enable()
+            self.status_var.set("Profiling enabled: stage timings and memory deltas are recorded for each redraw and load")
+        else:
+            self.profiler.disable()
+            self.status_var.set("Profiling disabled")
+    
+    def open_diagnostics(self):
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            self.refresh_diagnostics()
+            return
+        
+        self.diagnostics_window = tk.Toplevel(self.root)
+        self.diagnostics_window.title("Diagnostics")
+        self.diagnostics_window.geometry("700x500")
+        
+        button_frame = tk.Frame(self.diagnostics_window)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        tk.Button(button_frame, text="Refresh", command=self.refresh_diagnostics).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Clear History", command=self.clear_diagnostics).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="cProfile Next Redraw...", command=self.request_redraw_trace).pack(side=tk.LEFT, padx=5)
+        
+        text_frame = tk.Frame(self.diagnostics_window)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        scrollbar = tk.Scrollbar(text_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.diagnostics_text = tk.Text(text_frame, font=("Courier", 10), yscrollcommand=scrollbar.set)
+        self.diagnostics_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.diagnostics_text.yview)
+        
+        self.refresh_diagnostics()
+    
+    def refresh_diagnostics(self):
+        if self.diagnostics_window is None or not self.diagnostics_window.winfo_exists():
+            return
+        
+        # Most recent run first
+        if self.profiler.history:
+            report = "\n\n".join(run.details() for run in reversed(self.profiler.history))
+        else:
+            report = "No runs recorded yet. Enable profiling, then load a file or redraw a chart."
+        
+        self.diagnostics_text.config(state=tk.NORMAL)
+        self.diagnostics_text.delete("1.0", tk.END)
+        self.diagnostics_text.insert(tk.END, report)
+        self.diagnostics_text.config(state=tk.DISABLED)
+    
+    def clear_diagnostics(self):
+        self.profiler.history.clear()
+        self.refresh_diagnostics()
+    
+    def request_redraw_trace(self):
+        path = filedialog.asksaveasfilename(
+            title="Save cProfile Trace",
+            defaultextension=".prof",
+            filetypes=[("cProfile Stats", "*.prof"), ("All Files", "*.*")]
+        )
+        if not path:
+            return
+        
+        # Traced on the next redraw, which we trigger right away
+        self.profiler.trace_next(path)
+        self.update_chart()
+    
     def clear_right_panel(self):
-        for widget in self.right_panel.winfo_children():
+        # Keep the canvas; only drop the figure's artists and the per-chart widgets
+        self.figure.clear()
+        for widget in self.details_frame.winfo_children():
             widget.destroy()
+        self.details_frame.pack_configure(expand=False)
+    
+    def selected_director_name(self):
+        if self.selected_director.get() != "All Directors":
+            return self.selected_director.get()
+        return None
     
     def filter_by_year_range(self):
-        if self.df is None:
+        if self.data is None:
             return None
             
         year_min = self.year_min.get()
         year_max = self.year_max.get()
         
-        filtered_df = self.df[(self.df['year'] >= year_min) & (self.df['year'] <= year_max)]
-        
-        # Apply director filter if selected
-        if self.selected_director.get() != "All Directors":
-            filtered_df = filtered_df[filtered_df['director'] == self.selected_director.get()]
-        
-        return filtered_df
+        # Row positions (ordered by year) of the matching movies, no DataFrame copy
+        return self.data.select(year_min, year_max, self.selected_director_name(), self.search_text())
     
     def update_chart(self, *args):
-        if self.df is None:
+        if self.data is None:
             return
-            
-        self.clear_right_panel()
+        
+        # A direct redraw supersedes any redraw still waiting in the scheduler
+        self.chart_scheduler.cancel()
         chart_type = self.chart_var.get()
+        run = self.current_run = self.profiler.start_run(f"Redraw {chart_type}")
         
         try:
-            filtered_df = self.filter_by_year_range()
-            if filtered_df.empty:
-                tk.Label(self.right_panel, text="No data in selected range", 
-                        font=("Arial", 14), bg="white").pack(expand=True)
+            with self.profiler.traced() as trace_path:
+                self.draw_current_chart(chart_type, run)
+            self.profiler.finish_run(run)
+            
+            if self.profiler.enabled:
+                self.status_var.set(f"{self.status_var.get()} | {run.summary()}")
+                self.refresh_diagnostics()
+            if trace_path and self.profiler.trace_path is None:
+                self.status_var.set(f"{self.status_var.get()} | cProfile trace saved to {trace_path}")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to create chart: {str(e)}")
+            self.status_var.set(f"Error creating {chart_type} chart")
+        finally:
+            self.current_run = DISABLED_RUN
+    
+    def chart_key(self, chart_type):
+        # The chart and filter state a set of aggregates was computed for
+        return (chart_type, self.year_min.get(), self.year_max.get(), self.selected_director_name(),
+                self.search_text(), self.data.fingerprint)
+    
+    def draw_current_chart(self, chart_type, run):
+        with run.stage('clear'):
+            self.clear_right_panel()
+        
+        # Reuse aggregates when flipping back to a chart/filter combination already computed
+        director = self.selected_director_name()
+        search = self.search_text()
+        key = self.chart_key(chart_type)
+        aggregates = self.aggregate_cache.get(key)
+        if aggregates is None:
+            if self.data.background_queries:
+                # Slow backends answer on a worker thread; the chart is drawn once they are
+                # done, and a requested cProfile trace waits for that redraw
+                self.start_query(key)
+                self.profiler.postpone_trace()
+                self.show_message("Querying the database...")
                 return
-                
+            
+            with run.stage('filter'):
+                rows = self.filter_by_year_range()
+            with run.stage('aggregate'):
+                aggregates = self.data.aggregates(chart_type, rows, director, search)
+            self.aggregate_cache.put(key, aggregates)
+        self.search_info_var.set(f"{aggregates['total']} matching movies" if search else "")
+        
+        if aggregates['total'] == 0:
+            self.show_message("No data in selected range")
+            return
+        
+        with run.stage('plot'):
             if chart_type == "Movies by Year":
-                self.plot_movies_by_year(filtered_df)
+                self.plot_movies_by_year(aggregates)
             elif chart_type == "Genre Distribution":
-                self.plot_genre_distribution(filtered_df)
+                self.plot_genre_distribution(aggregates)
             elif chart_type == "Director Analysis":
-                self.plot_director_analysis(filtered_df)
+                self.plot_director_analysis(aggregates)
             elif chart_type == "Cast Network":
-                self.plot_cast_analysis(filtered_df)
-            
-            # Update status with current filters
-            director_info = f", Director: {self.selected_director.get()}" if self.selected_director.get() != "All Directors" else ""
-            self.status_var.set(f"Displayed {chart_type} chart for years {self.year_min.get()}-{self.year_max.get()}{director_info}")
-            
+                self.plot_cast_analysis(aggregates)
+            elif chart_type == "Genre over Time":
+                self.plot_genre_over_time(aggregates)
+            elif chart_type == "Director Genre Mix":
+                self.plot_director_genre_mix(aggregates)
+        
+        # Update status with current filters
+        director_info = f", Director: {director}" if director else ""
+        if search:
+            director_info += f", Search: {search.strip()}"
+        self.status_var.set(f"Displayed {chart_type} chart for years {self.year_min.get()}-{self.year_max.get()}{director_info}"
+                            f" | {self.aggregate_cache.summary()}")
+    
+    def start_query(self, key):
+        # One query at a time; a redraw requested meanwhile is served when it finishes
+        if self.query_thread is not None:
+            return
+        
+        self.query_dataset = self.data
+        self.query_queue = queue.Queue()
+        self.query_thread = threading.Thread(target=self.query_worker, args=(self.data, key, self.query_queue),
+                                             daemon=True)
+        self.query_thread.start()
+        self.root.after(100, self.poll_query_queue)
+    
+    def query_worker(self, dataset, key, results):
+        chart_type, year_min, year_max, director, search, _ = key
+        try:
+            run = self.profiler.start_run(f"Query {chart_type}")
+            with run.stage('filter'):
+                rows = dataset.select(year_min, year_max, director, search)
+            with run.stage('aggregate'):
+                aggregates = dataset.aggregates(chart_type, rows, director, search)
+            self.profiler.finish_run(run)
+            result = ("done", key, aggregates)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to create chart: {str(e)}")
-            self.status_var.set(f"Error creating {chart_type} chart")
+            result = ("error", key, e)
+        finally:
+            dataset.release_reader()
+        results.put(result)
     
-    def plot_movies_by_year(self, df):
-        # Create figure
-        fig, ax = plt.subplots(figsize=(10, 6))
+    def poll_query_queue(self):
+        # Runs on the Tk thread via root.after until the query worker reports a result
+        try:
+            status, key, result = self.query_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.poll_query_queue)
+            return
         
-        # Plot data
-        year_counts = df['year'].value_counts().sort_index()
-        ax.plot(year_counts.index, year_counts.values, marker='o', linewidth=2, color='#FF9933')
+        dataset = self.query_dataset
+        self.query_thread = None
+        self.query_dataset = None
+        self.query_queue = None
+        if dataset is not self.data:
+            # Another file was loaded while the query ran
+            dataset.close()
+        elif status == "done":
+            self.aggregate_cache.put(key, result)
+        elif key == self.chart_key(self.chart_var.get()):
+            messagebox.showerror("Error", f"Failed to create chart: {str(result)}")
+            self.status_var.set(f"Error creating {key[0]} chart")
+            return
+        
+        # Draw what is selected now: the result just cached, or a request made meanwhile
+        self.update_chart()
+    
+    def plot_movies_by_year(self, aggregates):
+        charts.draw_movies_by_year(self.figure, aggregates, self.selected_director_name())
         
-        # Customize plot
-        title = 'Number of Bollywood Movies Released by Year'
-        if self.selected_director.get() != "All Directors":
-            title = f'Movies by {self.selected_director.get()} by Year'
-            
-        ax.set_title(title, fontsize=16)
-        ax.set_xlabel('Year', fontsize=12)
-        ax.set_ylabel('Number of Movies', fontsize=12)
-        ax.grid(True, linestyle='--', alpha=0.7)
-        
-        # Rotate x-axis labels
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-
         # Embed in tkinter
-        self.embed_matplotlib_plot(fig)
+        self.embed_matplotlib_plot()
         
         # Add summary statistics
-        stats_frame = tk.Frame(self.right_panel, bg="white")
+        stats_frame = tk.Frame(self.details_frame, bg="white")
         stats_frame.pack(fill=tk.X, pady=10)
         
         # Calculate statistics
-        total_movies = len(df)
-        year_range = f"{int(df['year'].min())} to {int(df['year'].max())}" if not df.empty else "N/A"
+        year_counts = aggregates['year_counts']
+        total_movies = aggregates['total']
+        year_range = f"{year_counts.index[0]} to {year_counts.index[-1]}" if total_movies else "N/A"
         
         if not year_counts.empty:
             peak_year = year_counts.idxmax()
@@ -281,182 +752,139 @@ class BollywoodDashboard:
                 bg="white", font=("Arial", 12)).pack(side=tk.LEFT, padx=20)
         tk.Label(stats_frame, text=peak_info, 
                 bg="white", font=("Arial", 12)).pack(side=tk.LEFT, padx=20)
+        
+        # Most frequently cast actors in the range; very large selections get estimates
+        top_actors = aggregates.get('top_actors')
+        if top_actors is not None and not top_actors.empty:
+            estimated = aggregates.get('top_actors_estimated', False)
+            actor_text = ",  ".join(f"{actor} ({'~' if estimated else ''}{count})" for actor, count in top_actors.items())
+            label = "Most Cast (estimated)" if estimated else "Most Cast"
+            tk.Label(self.details_frame, text=f"{label}: {actor_text}", bg="white",
+                    font=("Arial", 11), wraplength=900, justify=tk.LEFT).pack(anchor=tk.W, padx=20)
     
-    def plot_genre_distribution(self, df):
-        # Extract all genres
-        all_genres = []
-        for genres in df['genre'].dropna():
-            # Split genres (assuming they're comma or pipe separated)
-            genre_list = re.split(r'[,|]', genres)
-            all_genres.extend([g.strip() for g in genre_list])
-        
-        # Count genres
-        genre_counts = Counter(all_genres)
-        top_genres = dict(genre_counts.most_common(10))
-        
-        if not top_genres:
-            tk.Label(self.right_panel, text="No genre data available for the selected filters", 
-                    font=("Arial", 14), bg="white").pack(expand=True)
+    def plot_genre_distribution(self, aggregates):
+        if aggregates['top_genres'].empty:
+            self.show_message("No genre data available for the selected filters")
             return
         
-        # Create figure
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Create pie chart
-        wedges, texts, autotexts = ax.pie(
-            top_genres.values(), 
-            labels=top_genres.keys(),
-            autopct='%1.1f%%',
-            startangle=90,
-            explode=[0.05] * len(top_genres),
-            shadow=True,
-            colors=plt.cm.Paired(range(len(top_genres)))
-        )
+        charts.draw_genre_distribution(self.figure, aggregates, self.selected_director_name())
         
-        # Style the chart
-        plt.setp(autotexts, size=9, weight="bold")
+        # Embed in tkinter
+        self.embed_matplotlib_plot()
+    
+    def plot_genre_over_time(self, aggregates):
+        if not aggregates['genre_years'].to_numpy().any():
+            self.show_message("No genre data available for the selected filters")
+            return
         
-        title = 'Top 10 Bollywood Movie Genres'
-        if self.selected_director.get() != "All Directors":
-            title = f'Genres in {self.selected_director.get()} Movies'
-            
-        ax.set_title(title, fontsize=16)
-        plt.tight_layout()
+        charts.draw_genre_over_time(self.figure, aggregates, self.selected_director_name())
         
         # Embed in tkinter
-        self.embed_matplotlib_plot(fig)
+        self.embed_matplotlib_plot()
     
-    def plot_director_analysis(self, df):
+    def plot_director_genre_mix(self, aggregates):
+        if not aggregates['director_genres'].to_numpy().any():
+            self.show_message("No genre data available for the selected filters")
+            return
+        
+        charts.draw_director_genre_mix(self.figure, aggregates, self.selected_director_name())
+        
+        # Embed in tkinter
+        self.embed_matplotlib_plot()
+    
+    def plot_director_analysis(self, aggregates):
         if self.selected_director.get() != "All Directors":
             # Show movies by this director over time
-            director_df = df[df['director'] == self.selected_director.get()]
-            
-            # Group by year
-            movies_by_year = director_df['year'].value_counts().sort_index()
-            
-            if movies_by_year.empty:
-                tk.Label(self.right_panel, text=f"No data available for director: {self.selected_director.get()}", 
-                        font=("Arial", 14), bg="white").pack(expand=True)
+            if aggregates['year_counts'].empty:
+                self.show_message(f"No data available for director: {self.selected_director.get()}")
                 return
             
-            # Create figure
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Create bar chart
-            ax.bar(movies_by_year.index, movies_by_year.values, color='#138808')
-            
-            # Add labels
-            ax.set_title(f'Movies by {self.selected_director.get()} Over Time', fontsize=16)
-            ax.set_xlabel('Year', fontsize=12)
-            ax.set_ylabel('Number of Movies', fontsize=12)
-            
-            # Adjust layout
-            plt.tight_layout()
+            charts.draw_director_timeline(self.figure, aggregates, self.selected_director.get())
             
             # Embed in tkinter
-            self.embed_matplotlib_plot(fig)
+            self.embed_matplotlib_plot()
             
             # Add movie list
-            movie_list_frame = tk.Frame(self.right_panel, bg="white")
-            movie_list_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-            
-            # Create scrollable list
-            tk.Label(movie_list_frame, text=f"Movies by {self.selected_director.get()}:", 
-                    font=("Arial", 14, "bold"), bg="white").pack(anchor=tk.W, pady=(0, 10))
-            
-            # Create scrollable list
-            list_frame = tk.Frame(movie_list_frame, bg="white")
-            list_frame.pack(fill=tk.BOTH, expand=True)
-            
-            scrollbar = tk.Scrollbar(list_frame)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            movie_listbox = tk.Listbox(list_frame, width=70, height=10, 
-                                      font=("Arial", 11), yscrollcommand=scrollbar.set)
-            movie_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            scrollbar.config(command=movie_listbox.yview)
-            
-            # Add movies to list
-            for _, movie in director_df.sort_values('year').iterrows():
-                movie_text = f"{int(movie['year'])} - {movie['movie_name']}"
-                movie_listbox.insert(tk.END, movie_text)
+            self.show_movie_table(f"Movies by {self.selected_director.get()}:", aggregates['movies'],
+                                  [("Year", 80, 'year'), ("Title", 500, 'movie_name')])
             
         else:
-            # Count movies by director
-            director_counts = df['director'].value_counts().head(10)
-            
-            # Create figure
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Create horizontal bar chart
-            bars = ax.barh(director_counts.index, director_counts.values, color='#138808', alpha=0.8)
-            
-            # Add labels
-            ax.set_title('Top 10 Bollywood Directors by Number of Movies', fontsize=16)
-            ax.set_xlabel('Number of Movies', fontsize=12)
-            ax.set_ylabel('Director', fontsize=12)
-            
-            # Add value labels
-            for i, v in enumerate(director_counts.values):
-                ax.text(v + 0.1, i, str(v), va='center')
-            
-            # Adjust layout
-            plt.tight_layout()
+            charts.draw_top_directors(self.figure, aggregates)
             
             # Embed in tkinter
-            self.embed_matplotlib_plot(fig)
-    
-    def plot_cast_analysis(self, df):
-        # Extract top actors
-        all_actors = []
-        for cast in df['cast'].dropna():
-            # Split cast (assuming they're comma or pipe separated)
-            actor_list = re.split(r'[,|]', cast)
-            all_actors.extend([a.strip() for a in actor_list])
-        
-        # Count actors
-        actor_counts = Counter(all_actors)
-        top_actors = dict(actor_counts.most_common(10))
-        
-        if not top_actors:
-            tk.Label(self.right_panel, text="No cast data available for the selected filters", 
-                    font=("Arial", 14), bg="white").pack(expand=True)
+            self.embed_matplotlib_plot()
+            
+            # List every matching title below the chart
+            self.show_movie_table(f"All Matching Movies ({aggregates['total']}):", aggregates['movies'],
+                                  [("Year", 80, 'year'), ("Title", 400, 'movie_name'), ("Director", 250, 'director')])
+    
+    def show_movie_table(self, title, movies, columns):
+        # Virtualized table: only the visible rows are ever fetched and turned into widgets
+        self.details_frame.pack_configure(expand=True)
+        movie_list_frame = tk.Frame(self.details_frame, bg="white")
+        movie_list_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        
+        tk.Label(movie_list_frame, text=f"{title} (click a column heading to sort)", 
+                font=("Arial", 14, "bold"), bg="white").pack(anchor=tk.W, pady=(0, 10))
+        
+        table = VirtualTable(movie_list_frame, columns, bg="white")
+        table.pack(fill=tk.BOTH, expand=True)
+        table.set_listing(movies)
+    
+    def plot_cast_analysis(self, aggregates):
+        network = aggregates['network']
+        if network['centrality'].empty:
+            self.show_message("No cast data available for the selected filters")
             return
         
-        # Create figure
-        fig, ax = plt.subplots(figsize=(10, 6))
+        charts.draw_cast_network(self.figure, aggregates, self.selected_director_name())
         
-        # Create bar chart
-        x = range(len(top_actors))
-        bars = ax.bar(x, top_actors.values(), width=0.7, color=plt.cm.tab10(range(len(top_actors))))
+        # Embed in tkinter
+        self.embed_matplotlib_plot()
         
-        # Add labels
-        title = 'Top 10 Bollywood Actors by Movie Appearances'
-        if self.selected_director.get() != "All Directors":
-            title = f'Top Actors in {self.selected_director.get()} Movies'
-            
-        ax.set_title(title, fontsize=16)
-        ax.set_ylabel('Number of Movies', fontsize=12)
-        ax.set_xticks(x)
-        ax.set_xticklabels(top_actors.keys(), rotation=45, ha='right')
+        # Add network statistics
+        stats_frame = tk.Frame(self.details_frame, bg="white")
+        stats_frame.pack(fill=tk.X, pady=10)
         
-        # Add value labels
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                    f'{height:.0f}', ha='center', va='bottom')
+        centrality = network['centrality']
+        most_connected = centrality['co_stars'].idxmax()
         
-        # Adjust layout
-        plt.tight_layout()
+        tk.Label(stats_frame, text=f"Actors: {network['n_actors']}", 
+                bg="white", font=("Arial", 12)).pack(side=tk.LEFT, padx=20)
+        tk.Label(stats_frame, text=f"Collaborating Pairs: {network['n_edges']}", 
+                bg="white", font=("Arial", 12)).pack(side=tk.LEFT, padx=20)
+        tk.Label(stats_frame, text=f"Most Connected: {most_connected} ({centrality.loc[most_connected, 'co_stars']} co-stars)", 
+                bg="white", font=("Arial", 12)).pack(side=tk.LEFT, padx=20)
         
-        # Embed in tkinter
-        self.embed_matplotlib_plot(fig)
+        # Strongest on-screen pairings
+        pairs = network['pairs'].head(5)
+        if not pairs.empty:
+            pair_text = ",  ".join(f"{pair.actor_a} & {pair.actor_b} ({pair.movies})" for pair in pairs.itertuples())
+            tk.Label(self.details_frame, text=f"Top Collaborations: {pair_text}", bg="white",
+                    font=("Arial", 11), wraplength=900, justify=tk.LEFT).pack(anchor=tk.W, padx=20)
     
-    def embed_matplotlib_plot(self, figure):
-        # Create canvas
-        canvas = FigureCanvasTkAgg(figure, master=self.right_panel)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    def show_message(self, text):
+        # Hide the chart and show a centred message in its place
+        self.canvas.get_tk_widget().pack_forget()
+        self.details_frame.pack_configure(expand=True)
+        tk.Label(self.details_frame, text=text, font=("Arial", 14), bg="white").pack(expand=True)
+    
+    def embed_matplotlib_plot(self):
+        # Redraw the shared canvas, showing it again if a message had replaced it
+        canvas_widget = self.canvas.get_tk_widget()
+        if not canvas_widget.winfo_manager():
+            canvas_widget.pack(fill=tk.BOTH, expand=True, before=self.details_frame)
+        
+        with self.current_run.stage('layout'):
+            self.figure.tight_layout()
+        
+        # Draw right away when profiling or tracing so the canvas time is measured,
+        # otherwise on idle
+        if self.profiler.enabled or self.profiler.active_trace:
+            with self.current_run.stage('canvas'):
+                self.canvas.draw()
+        else:
+            self.canvas.draw_idle()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Co-appearance network of actors. For the selected movies we build a sparse
+# actor x movie incidence matrix A; A @ A.T then holds, for every pair of actors, the
+# number of movies they appeared in together, so no pairwise Python loops are needed.
+
+
+def incidence_matrix(cast_index, rows=None):
+    # Returns (A, actor_codes): A[i, j] = 1 when actor actor_codes[i] is in the j-th
+    # selected movie. Only actors that appear in the selection get a matrix row.
+    if rows is None:
+        movie_rows, actor_codes = cast_index.rows, cast_index.codes
+    else:
+        selected = np.zeros(cast_index.n_movies, dtype=bool)
+        selected[rows] = True
+        keep = selected[cast_index.rows]
+        movie_rows, actor_codes = cast_index.rows[keep], cast_index.codes[keep]
+
+    actors, actor_idx = np.unique(actor_codes, return_inverse=True)
+    movies, movie_idx = np.unique(movie_rows, return_inverse=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(actor_idx), dtype=np.int32), (actor_idx, movie_idx)),
+        shape=(len(actors), len(movies)),
+    )
+
+    # An actor listed twice for the same movie still counts as one appearance
+    incidence.sum_duplicates()
+    incidence.data[:] = 1
+    return incidence, actors
+
+
+def co_star_network(cast_index, rows=None, top_n=15, top_pairs=10):
+    incidence, actors = incidence_matrix(cast_index, rows)
+    labels = cast_index.labels[actors]
+
+    # Co-star counts for every pair of actors; the diagonal would just be appearances
+    co_star = (incidence @ incidence.T).tocsr()
+    co_star.setdiag(0)
+    co_star.eliminate_zeros()
+
+    appearances = np.asarray(incidence.sum(axis=1)).ravel()
+    degree = np.diff(co_star.indptr)
+    weighted_degree = np.asarray(co_star.sum(axis=1)).ravel()
+
+    # Strongest collaborations, each pair counted once
+    upper = sparse.triu(co_star, k=1).tocoo()
+    if upper.nnz > top_pairs:
+        strongest = np.argpartition(-upper.data, top_pairs)[:top_pairs]
+    else:
+        strongest = np.arange(upper.nnz)
+    strongest = strongest[np.argsort(-upper.data[strongest], kind='stable')]
+    pairs = pd.DataFrame({
+        'actor_a': labels[upper.row[strongest]],
+        'actor_b': labels[upper.col[strongest]],
+        'movies': upper.data[strongest],
+    })
+
+    # Subgraph of the most frequently cast actors, small enough to draw
+    top = np.argsort(-appearances, kind='stable')[:top_n]
+    centrality = pd.DataFrame({
+        'movies': appearances[top],
+        'co_stars': degree[top],
+        'weighted_degree': weighted_degree[top],
+    }, index=labels[top])
+
+    return {
+        'n_actors': len(actors),
+        'n_edges': upper.nnz,
+        'centrality': centrality,
+        'pairs': pairs,
+        'subgraph': co_star[top][:, top].toarray(),
+    }
@@ -0,0 +1,206 @@
+import matplotlib
+import numpy as np
+from matplotlib.artist import setp
+from matplotlib.collections import LineCollection
+
+# Chart drawing on a caller-owned Figure. Nothing here goes through pyplot, so redraws
+# never register new figures; callers clear and reuse the same Figure every time.
+# The draw_* functions leave layout to the caller (figure.tight_layout), draw_chart does both.
+
+
+def draw_movies_by_year(figure, aggregates, director=None):
+    ax = figure.add_subplot()
+
+    # Plot data
+    year_counts = aggregates['year_counts']
+    ax.plot(year_counts.index, year_counts.values, marker='o', linewidth=2, color='#FF9933')
+
+    # Customize plot
+    title = 'Number of Bollywood Movies Released by Year'
+    if director:
+        title = f'Movies by {director} by Year'
+
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Number of Movies', fontsize=12)
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+    # Rotate x-axis labels
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def draw_genre_distribution(figure, aggregates, director=None):
+    ax = figure.add_subplot()
+    top_genres = aggregates['top_genres']
+
+    # Create pie chart
+    wedges, texts, autotexts = ax.pie(
+        top_genres.values,
+        labels=top_genres.index,
+        autopct='%1.1f%%',
+        startangle=90,
+        explode=[0.05] * len(top_genres),
+        shadow=True,
+        colors=matplotlib.colormaps['Paired'](range(len(top_genres)))
+    )
+
+    # Style the chart
+    setp(autotexts, size=9, weight="bold")
+
+    title = 'Top 10 Bollywood Movie Genres'
+    if director:
+        title = f'Genres in {director} Movies'
+
+    ax.set_title(title, fontsize=16)
+
+
+def draw_director_timeline(figure, aggregates, director):
+    ax = figure.add_subplot()
+    movies_by_year = aggregates['year_counts']
+
+    # Create bar chart
+    ax.bar(movies_by_year.index, movies_by_year.values, color='#138808')
+
+    # Add labels
+    ax.set_title(f'Movies by {director} Over Time', fontsize=16)
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Number of Movies', fontsize=12)
+
+
+def draw_top_directors(figure, aggregates):
+    ax = figure.add_subplot()
+    director_counts = aggregates['director_counts']
+
+    # Create horizontal bar chart
+    ax.barh(director_counts.index, director_counts.values, color='#138808', alpha=0.8)
+
+    # Add labels
+    ax.set_title('Top 10 Bollywood Directors by Number of Movies', fontsize=16)
+    ax.set_xlabel('Number of Movies', fontsize=12)
+    ax.set_ylabel('Director', fontsize=12)
+
+    # Add value labels
+    for i, v in enumerate(director_counts.values):
+        ax.text(v + 0.1, i, str(v), va='center')
+
+
+
+def draw_cast_network(figure, aggregates, director=None):
+    ax = figure.add_subplot()
+    network = aggregates['network']
+    centrality = network['centrality']
+    weights = network['subgraph']
+    n = len(centrality)
+
+    # Place the most frequently cast actors on a circle
+    angles = np.pi / 2 - np.linspace(0, 2 * np.pi, n, endpoint=False)
+    xy = np.column_stack([np.cos(angles), np.sin(angles)])
+
+    # Draw an edge for every pair that shared a movie, thicker for more shared movies
+    a, b = np.nonzero(np.triu(weights, k=1))
+    if len(a):
+        shared = weights[a, b]
+        edges = LineCollection(np.stack([xy[a], xy[b]], axis=1), colors='#138808', alpha=0.5,
+                               linewidths=0.5 + 5 * shared / shared.max())
+        ax.add_collection(edges)
+
+    # Size nodes by number of movies
+    movies = centrality['movies'].to_numpy()
+    ax.scatter(xy[:, 0], xy[:, 1], s=150 + 650 * movies / movies.max(), zorder=3,
+               color=matplotlib.colormaps['tab20'](range(n)), edgecolors='white')
+    for (x, y), name, count in zip(xy, centrality.index, movies):
+        ax.text(1.12 * x, 1.12 * y, f'{name} ({count})', fontsize=9, va='center',
+                ha='left' if x >= 0 else 'right')
+
+    title = f'Co-star Network of the Top {n} Bollywood Actors'
+    if director:
+        title = f'Co-star Network in {director} Movies'
+
+    ax.set_title(title, fontsize=16)
+    ax.set_xlim(-2.0, 2.0)
+    ax.set_ylim(-1.25, 1.25)
+    ax.set_aspect('equal')
+    ax.axis('off')
+
+
+def draw_genre_over_time(figure, aggregates, director=None):
+    ax = figure.add_subplot()
+    genre_years = aggregates['genre_years']
+
+    # Stacked areas, one band per genre
+    ax.stackplot(genre_years.index, genre_years.to_numpy().T, labels=genre_years.columns,
+                 colors=matplotlib.colormaps['tab10'](range(genre_years.shape[1])), alpha=0.85)
+
+    title = 'Bollywood Movie Genres Over Time'
+    if director:
+        title = f'Genres in {director} Movies Over Time'
+
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Genre Tags', fontsize=12)
+    ax.legend(loc='upper left', fontsize=9)
+    ax.grid(True, linestyle='--', alpha=0.5)
+
+
+def draw_director_genre_mix(figure, aggregates, director=None):
+    ax = figure.add_subplot()
+    director_genres = aggregates['director_genres']
+
+    # One horizontal bar per director, split into genre shares
+    shares = director_genres.div(director_genres.sum(axis=1).replace(0, 1), axis=0) * 100
+    colors = matplotlib.colormaps['tab10'](range(shares.shape[1]))
+    left = np.zeros(len(shares))
+    for genre, color in zip(shares.columns, colors):
+        ax.barh(shares.index, shares[genre], left=left, color=color, label=genre)
+        left += shares[genre].to_numpy()
+    ax.invert_yaxis()
+
+    title = 'Genre Mix of the Top Bollywood Directors'
+    if director:
+        title = f'Genre Mix of {director} Movies'
+
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Share of Genre Tags (%)', fontsize=12)
+    ax.set_xlim(0, 100)
+    ax.legend(loc='upper left', bbox_to_anchor=(1.01, 1), fontsize=9)
+
+
+def chart_has_data(chart_type, aggregates):
+    if aggregates['total'] == 0:
+        return False
+    if chart_type == "Genre Distribution":
+        return not aggregates['top_genres'].empty
+    if chart_type == "Cast Network":
+        return not aggregates['network']['centrality'].empty
+    if chart_type == "Genre over Time":
+        return aggregates['genre_years'].to_numpy().any()
+    if chart_type == "Director Genre Mix":
+        return aggregates['director_genres'].to_numpy().any()
+    return True
+
+
+def draw_chart(figure, chart_type, aggregates, director=None):
+    # Draw any dashboard chart from its aggregates; returns False if there is nothing to draw
+    if not chart_has_data(chart_type, aggregates):
+        return False
+
+    if chart_type == "Movies by Year":
+        draw_movies_by_year(figure, aggregates, director)
+    elif chart_type == "Genre Distribution":
+        draw_genre_distribution(figure, aggregates, director)
+    elif chart_type == "Director Analysis":
+        if director:
+            draw_director_timeline(figure, aggregates, director)
+        else:
+            draw_top_directors(figure, aggregates)
+    elif chart_type == "Cast Network":
+        draw_cast_network(figure, aggregates, director)
+    elif chart_type == "Genre over Time":
+        draw_genre_over_time(figure, aggregates, director)
+    elif chart_type == "Director Genre Mix":
+        draw_director_genre_mix(figure, aggregates, director)
+    else:
+        raise ValueError(f"Unknown chart type: {chart_type}")
+
+    figure.tight_layout()
+    return True
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from search_index import InvertedIndex
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # the cache is optional; without pyarrow every load parses the CSV
+    pa = None
+    feather = None
+
+# Sidecar directory written next to the source CSV, e.g. movies.csv -> movies.csv.cache/
+CACHE_SUFFIX = '.cache'
+
+# Bump whenever the cached layout or the cleaning applied before caching changes
+CACHE_VERSION = 3
+
+# Bytes hashed from each end of the source file when fingerprinting it
+HASH_SAMPLE_BYTES = 1 << 20
+
+
+def cache_available():
+    return feather is not None
+
+
+def cache_dir(filepath):
+    return filepath + CACHE_SUFFIX
+
+
+def source_key(filepath):
+    # Identify the source file by size, mtime and a hash of its first and last megabyte,
+    # so a cache hit never needs to read the whole CSV
+    stat = os.stat(filepath)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as handle:
+        digest.update(handle.read(HASH_SAMPLE_BYTES))
+        if stat.st_size > HASH_SAMPLE_BYTES:
+            handle.seek(max(HASH_SAMPLE_BYTES, stat.st_size - HASH_SAMPLE_BYTES))
+            digest.update(handle.read())
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+
+def head_hash(filepath, n_bytes):
+    # Hash of the first `n_bytes` of a file; used to tell an appended-to file from a rewritten one
+    with open(filepath, 'rb') as handle:
+        return hashlib.blake2b(handle.read(n_bytes), digest_size=16).hexdigest()
+
+
+def _token_table(index):
+    return pa.table({'row': index.rows, 'code': index.codes})
+
+
+def _label_table(index):
+    return pa.table({'label': pa.array(index.labels.tolist(), type=pa.string())})
+
+
+def _term_table(index):
+    return pa.table({'term': pa.array(index.terms.tolist(), type=pa.string()), 'n_rows': np.diff(index.offsets)})
+
+
+def _postings_table(index):
+    return pa.table({'row': index.rows})
+
+
+def write_cache(filepath, dataset):
+    # Persist the cleaned movie table, its genre/cast tables and the search index; best
+    # effort, a failure (read-only directory, unsupported column type) just means the
+    # next load parses again
+    if not cache_available():
+        return False
+
+    directory = cache_dir(filepath)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        titles, overviews = dataset.search.merged()
+        tables = {
+            'movies': pa.Table.from_pandas(dataset.df, preserve_index=False),
+            'genre_rows': _token_table(dataset.genre_index),
+            'genre_labels': _label_table(dataset.genre_index),
+            'cast_rows': _token_table(dataset.cast_index),
+            'cast_labels': _label_table(dataset.cast_index),
+            'title_terms': _term_table(titles),
+            'title_postings': _postings_table(titles),
+            'overview_terms': _term_table(overviews),
+            'overview_postings': _postings_table(overviews),
+        }
+        for name, table in tables.items():
+            # Uncompressed so the files can be memory-mapped on the next start
+            feather.write_feather(table, os.path.join(directory, name + '.feather'), compression='uncompressed')
+
+        # Written last: a cache without meta.json is never read
+        meta = {
+            'version': CACHE_VERSION,
+            'source': source_key(filepath),
+            'fingerprint': dataset.fingerprint,
+            'n_movies': len(dataset.df),
+            'memory_before': dataset.memory_before,
+        }
+        with open(meta_path, 'w') as handle:
+            json.dump(meta, handle)
+        return True
+    except (OSError, pa.ArrowException, TypeError, ValueError):
+        return False
+
+
+def read_cache(filepath):
+    # Return the cached pieces for `filepath` if a cache exists and still matches the
+    # source file, otherwise None
+    if not cache_available():
+        return None
+
+    directory = cache_dir(filepath)
+    try:
+        with open(os.path.join(directory, 'meta.json')) as handle:
+            meta = json.load(handle)
+        if meta.get('version') != CACHE_VERSION or meta.get('source') != source_key(filepath):
+            return None
+
+        def read(name):
+            return feather.read_table(os.path.join(directory, name + '.feather'), memory_map=True)
+
+        def tokens(prefix):
+            table = read(prefix + '_rows')
+            labels = read(prefix + '_labels').column('label').to_numpy(zero_copy_only=False)
+            return (table.column('row').to_numpy(), table.column('code').to_numpy(),
+                    np.asarray(labels, dtype=object))
+
+        def postings(prefix):
+            terms = read(prefix + '_terms')
+            offsets = np.concatenate(([0], np.cumsum(terms.column('n_rows').to_numpy())))
+            return InvertedIndex(np.asarray(terms.column('term').to_numpy(zero_copy_only=False), dtype=object),
+                                 offsets, read(prefix + '_postings').column('row').to_numpy())
+
+        return {
+            'df': read('movies').to_pandas(),
+            'genres': tokens('genre'),
+            'cast': tokens('cast'),
+            'titles': postings('title'),
+            'overviews': postings('overview'),
+            'fingerprint': meta['fingerprint'],
+            'n_movies': meta['n_movies'],
+            'memory_before': meta.get('memory_before'),
+            'source_size': meta['source']['size'],
+        }
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
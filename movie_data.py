@@ -0,0 +1,684 @@
+import importlib.util
+import io
+import os
+from collections import OrderedDict
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+import dataset_cache
+from aggregate_cube import AggregateCube, stacked_genre_table
+from cast_network import co_star_network
+from search_index import WORD_PATTERN, MovieSearch, query_words
+
+# Genres and cast members are stored as comma or pipe separated lists
+SPLIT_PATTERN = r'[,|]'
+
+CHART_TYPES = ["Movies by Year", "Genre Distribution", "Director Analysis", "Cast Network",
+               "Genre over Time", "Director Genre Mix"]
+
+REQUIRED_COLUMNS = ['movie_id', 'movie_name', 'year', 'genre', 'director', 'cast']
+
+# Columns that are parsed but never kept: the long overview text only feeds the search
+# index at load time
+LAZY_COLUMNS = ['overview']
+PARSED_COLUMNS = REQUIRED_COLUMNS + LAZY_COLUMNS
+
+# Arrow-backed strings take far less memory than Python string objects when pyarrow is installed
+ARROW_STRINGS = importlib.util.find_spec('pyarrow') is not None
+
+# Rows parsed per chunk when reading a CSV; progress and cancellation are checked between chunks
+LOAD_CHUNK_ROWS = 100_000
+
+# Selections of up to this many movies get exact "Most Cast" counts from their cast tokens;
+# larger ones are estimated from the aggregate cube's per-year sketches
+EXACT_TOP_ACTORS_ROWS = 1_000_000
+
+
+class MissingColumnsError(ValueError):
+    def __init__(self, missing_columns):
+        super().__init__(f"The CSV file is missing these required columns: {', '.join(missing_columns)}")
+        self.missing_columns = missing_columns
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+class SourceRewritten(Exception):
+    # The source file shrank or its start changed, so it was not just appended to
+    def __init__(self, filepath):
+        super().__init__(f"{filepath} was rewritten; it has to be loaded again")
+        self.filepath = filepath
+
+
+def iter_movies_csv(filepath, progress=None, cancel_event=None, chunksize=LOAD_CHUNK_ROWS):
+    # Read and clean a movies CSV in chunks, yielding (chunk, bytes_read) pairs.
+    # `progress(bytes_read, total_bytes)` is called after every chunk, and setting
+    # `cancel_event` stops the read with LoadCancelled.
+    total_bytes = os.path.getsize(filepath)
+
+    # Check if required columns exist
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in read_csv_header(filepath)]
+    if missing_columns:
+        raise MissingColumnsError(missing_columns)
+
+    with open(filepath, 'rb') as handle:
+        # index_col=False: a row with an extra field keeps its columns instead of having
+        # its first field taken for an index
+        for chunk in pd.read_csv(handle, chunksize=chunksize, index_col=False,
+                                 usecols=lambda column: column in PARSED_COLUMNS):
+            if cancel_event is not None and cancel_event.is_set():
+                raise LoadCancelled()
+
+            # Clean data
+            chunk['year'] = pd.to_numeric(chunk['year'], errors='coerce')
+            if progress is not None:
+                progress(handle.tell(), total_bytes)
+            yield chunk, handle.tell()
+
+
+def read_movies_csv(filepath, progress=None, cancel_event=None, chunksize=LOAD_CHUNK_ROWS):
+    # The whole cleaned table plus the number of bytes consumed, where appended rows will start
+    chunks = []
+    bytes_read = 0
+    for chunk, bytes_read in iter_movies_csv(filepath, progress, cancel_event, chunksize):
+        chunks.append(chunk)
+    return pd.concat(chunks, ignore_index=True), bytes_read
+
+
+def read_csv_header(filepath):
+    return pd.read_csv(filepath, nrows=0).columns.tolist()
+
+
+def read_appended_rows(filepath, offset, columns):
+    # Parse only the complete lines written to `filepath` after byte `offset`, using the
+    # original header's `columns`. A partly written last line is left for the next read.
+    # Returns the cleaned rows and the offset just past the last line parsed.
+    with open(filepath, 'rb') as handle:
+        handle.seek(offset)
+        data = handle.read()
+
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return None, offset
+
+    # Parsed like the full load (index_col=False). pandas needs usecols as a list here:
+    # with `names` and index_col=False a callable fails on rows with an extra field.
+    df = pd.read_csv(io.BytesIO(data[:end]), header=None, names=columns, index_col=False,
+                     usecols=[column for column in columns if column in PARSED_COLUMNS])
+    df['year'] = pd.to_numeric(df['year'], errors='coerce')
+    return df, offset + end
+
+
+def compact_movie_table(df, arrow_strings=ARROW_STRINGS):
+    # Shrink the parsed table: categoricals for the low-cardinality text columns, a
+    # nullable small integer for the year and optionally Arrow-backed strings elsewhere
+    df = df.copy()
+
+    # Anything that isn't a plausible integer year is treated as missing
+    year = df['year'].round()
+    df['year'] = year.where(year.between(0, np.iinfo(np.int16).max)).astype('Int16')
+
+    for column in ['director', 'genre']:
+        df[column] = df[column].astype('category')
+
+    if arrow_strings:
+        for column in ['movie_id', 'movie_name', 'cast']:
+            df[column] = df[column].astype('string[pyarrow]')
+    return df
+
+
+def frame_memory(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _untimed_stage(name):
+    return nullcontext()
+
+
+def load_dataset(filepath, progress=None, cancel_event=None, use_cache=True, stage=_untimed_stage):
+    # Reuse the columnar sidecar cache when it still matches the file, otherwise parse
+    # the CSV and write the cache for next time. `stage(name)` returns a context manager
+    # wrapped around each step, for profiling.
+    columns = read_csv_header(filepath)
+    if use_cache:
+        with stage('read cache'):
+            cached = dataset_cache.read_cache(filepath)
+        if cached is not None:
+            with stage('build indexes'):
+                dataset = MovieDataset(
+                    cached['df'],
+                    genre_index=TokenIndex(*cached['genres'], cached['n_movies']),
+                    cast_index=TokenIndex(*cached['cast'], cached['n_movies']),
+                    search=MovieSearch([cached['titles']], [cached['overviews']], cached['n_movies']),
+                    fingerprint=cached['fingerprint'],
+                    source_path=filepath,
+                )
+            dataset.loaded_from_cache = True
+            dataset.memory_before = cached['memory_before']
+            dataset.track_source(columns, cached['source_size'])
+            return dataset
+
+    with stage('parse csv'):
+        df, bytes_read = read_movies_csv(filepath, progress, cancel_event)
+    if cancel_event is not None and cancel_event.is_set():
+        raise LoadCancelled()
+
+    # The overview text is only needed to build the search index
+    overview = df.pop('overview') if 'overview' in df else None
+    with stage('compact dtypes'):
+        memory_before = frame_memory(df)
+        df = compact_movie_table(df)
+    with stage('build indexes'):
+        dataset = MovieDataset(df, overview=overview, source_path=filepath)
+    dataset.memory_before = memory_before
+    dataset.track_source(columns, bytes_read)
+    if use_cache:
+        with stage('write cache'):
+            dataset_cache.write_cache(filepath, dataset)
+    return dataset
+
+
+class TokenIndex:
+    # Long movie -> token table (e.g. movie -> genre, movie -> actor) built once at load
+    # time. `rows` holds row positions into the movie table and `codes` holds integer
+    # codes into `labels`, so counting tokens for any subset of movies is a vectorized
+    # lookup plus a bincount instead of re-splitting strings.
+
+    def __init__(self, rows, codes, labels, n_movies):
+        self.rows = rows
+        self.codes = codes
+        self.labels = labels
+        self.n_movies = n_movies
+        self.lookup = None
+
+    @classmethod
+    def from_series(cls, series, words=False):
+        # `words` splits free text into lowercase words instead of list items
+        series = series.reset_index(drop=True)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return cls.from_categorical(series, words)
+
+        if words:
+            tokens = series.dropna().astype(str).str.lower().str.findall(WORD_PATTERN).explode().dropna()
+        else:
+            tokens = series.dropna().astype(str).str.split(SPLIT_PATTERN, regex=True).explode().str.strip()
+        tokens = tokens[tokens != '']
+
+        # Codes follow first appearance order, which keeps tie ranking stable
+        codes, labels = pd.factorize(tokens, sort=False)
+        rows = tokens.index.to_numpy(dtype=np.int64)
+        return cls(rows, codes.astype(np.int32), np.asarray(labels, dtype=object), len(series))
+
+    @classmethod
+    def from_categorical(cls, series, words=False):
+        # Split each distinct value once, then expand to movies through the category codes
+        per_category = cls.from_series(pd.Series(series.cat.categories), words)
+        tokens_per_category = np.bincount(per_category.rows, minlength=per_category.n_movies)
+        category_starts = np.cumsum(tokens_per_category) - tokens_per_category
+
+        movie_categories = series.cat.codes.to_numpy()
+        movies = np.flatnonzero(movie_categories >= 0)
+        movie_categories = movie_categories[movies]
+        n_tokens = tokens_per_category[movie_categories]
+
+        # Position of every (movie, token) pair inside its category's token run
+        within = np.arange(n_tokens.sum()) - np.repeat(np.cumsum(n_tokens) - n_tokens, n_tokens)
+        codes = per_category.codes[np.repeat(category_starts[movie_categories], n_tokens) + within]
+        return cls(np.repeat(movies, n_tokens), codes, per_category.labels, len(series))
+
+    def extend(self, series):
+        # Add movies appended after the existing ones. Only the new values are split;
+        # known tokens keep their codes and unseen ones get the next free codes.
+        added = TokenIndex.from_series(series)
+        if self.lookup is None:
+            self.lookup = {label: code for code, label in enumerate(self.labels)}
+
+        mapping = np.empty(len(added.labels), dtype=np.int32)
+        new_labels = []
+        for i, label in enumerate(added.labels):
+            code = self.lookup.get(label)
+            if code is None:
+                code = self.lookup[label] = len(self.labels) + len(new_labels)
+                new_labels.append(label)
+            mapping[i] = code
+
+        self.rows = np.concatenate((self.rows, added.rows + self.n_movies))
+        self.codes = np.concatenate((self.codes, mapping[added.codes]))
+        if new_labels:
+            self.labels = np.concatenate((self.labels, np.asarray(new_labels, dtype=object)))
+        self.n_movies += added.n_movies
+
+    def counts(self, rows=None):
+        # Count token occurrences over the given movie row positions (all movies if None)
+        if rows is None:
+            codes = self.codes
+        else:
+            selected = np.zeros(self.n_movies, dtype=bool)
+            selected[rows] = True
+            codes = self.codes[selected[self.rows]]
+        return np.bincount(codes, minlength=len(self.labels))
+
+    def top(self, rows=None, n=10):
+        # Most common tokens as a Series (label -> count), highest first
+        counts = self.counts(rows)
+        order = np.argsort(-counts, kind='stable')[:n]
+        order = order[counts[order] > 0]
+        return pd.Series(counts[order], index=self.labels[order])
+
+
+class FilterEngine:
+    # Row positions kept sorted by year with a director -> positions index, so a year
+    # range (optionally within one director) is two binary searches and a slice.
+    # Results are arrays of row positions into the movie table, ordered by year.
+
+    def __init__(self, years, directors):
+        years = np.asarray(years, dtype=np.float64)
+
+        # Movies without a year never match a year range, so leave them out entirely
+        order = np.argsort(years, kind='stable')
+        order = order[~np.isnan(years[order])]
+        self.order = order
+        self.sorted_years = years[order]
+
+        # Integer-code every movie's director; -1 marks a missing director
+        directors = pd.Series(directors)
+        if isinstance(directors.dtype, pd.CategoricalDtype):
+            codes, labels = directors.cat.codes.to_numpy(), directors.cat.categories
+        else:
+            codes, labels = pd.factorize(directors.astype(object))
+        self.director_codes = codes.astype(np.int32)
+        self.director_labels = np.asarray(labels, dtype=object)
+        self.director_lookup = {name: code for code, name in enumerate(self.director_labels)}
+
+        # Group the year-sorted positions by director, keeping year order inside each group
+        sorted_codes = self.director_codes[order]
+        by_director = np.argsort(sorted_codes, kind='stable')
+        by_director = by_director[sorted_codes[by_director] >= 0]
+        self.director_rows = order[by_director]
+        self.director_years = self.sorted_years[by_director]
+        counts = np.bincount(sorted_codes[sorted_codes >= 0], minlength=len(self.director_labels))
+        self.director_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def extend(self, years, codes, labels):
+        # Add movies appended after the existing ones. `codes` index into `labels`, which
+        # must begin with the current director labels. The new positions are merged into
+        # the sorted arrays with binary searches, so every year range and every director
+        # selects the same movies as after a rebuild. The layout can still differ: new
+        # directors keep codes (and director_rows slices) after the existing ones.
+        years = np.asarray(years, dtype=np.float64)
+        codes = np.asarray(codes, dtype=np.int32)
+        rows = len(self.director_codes) + np.arange(len(years))
+        self.director_codes = np.concatenate((self.director_codes, codes))
+        for code in range(len(self.director_labels), len(labels)):
+            self.director_lookup[labels[code]] = code
+        self.director_labels = np.asarray(labels, dtype=object)
+
+        # Equal years go after the existing movies, as the stable sort would put them
+        order = np.argsort(years, kind='stable')
+        order = order[~np.isnan(years[order])]
+        rows, years, codes = rows[order], years[order], codes[order]
+        at = np.searchsorted(self.sorted_years, years, side='right')
+        self.order = np.insert(self.order, at, rows)
+        self.sorted_years = np.insert(self.sorted_years, at, years)
+
+        # Same within each director's slice; new directors' slices go at the end
+        by_director = np.argsort(codes, kind='stable')
+        by_director = by_director[codes[by_director] >= 0]
+        rows, years, codes = rows[by_director], years[by_director], codes[by_director]
+        n_new = len(labels) + 1 - len(self.director_offsets)
+        offsets = np.concatenate((self.director_offsets, np.repeat(self.director_offsets[-1], n_new)))
+        at = np.empty(len(rows), dtype=np.int64)
+        groups = np.flatnonzero(np.diff(codes, prepend=-1, append=len(labels)))
+        for start, end in zip(groups[:-1], groups[1:]):
+            code = codes[start]
+            first, last = offsets[code], offsets[code + 1]
+            at[start:end] = first + np.searchsorted(self.director_years[first:last], years[start:end], side='right')
+        self.director_rows = np.insert(self.director_rows, at, rows)
+        self.director_years = np.insert(self.director_years, at, years)
+        counts = np.diff(offsets) + np.bincount(codes, minlength=len(labels))
+        self.director_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def select(self, year_min, year_max, director=None):
+        if director is None:
+            rows, years = self.order, self.sorted_years
+        else:
+            code = self.director_lookup.get(director)
+            if code is None:
+                return self.order[:0]
+            start, end = self.director_offsets[code], self.director_offsets[code + 1]
+            rows, years = self.director_rows[start:end], self.director_years[start:end]
+
+        lo = np.searchsorted(years, year_min, side='left')
+        hi = np.searchsorted(years, year_max, side='right')
+        return rows[lo:hi]
+
+
+class AppendableDataset:
+    # Shared by the data backends: remembers where the loaded part of the source CSV ends
+    # so rows appended to it later can be read on their own. Subclasses set source_path
+    # and implement append_rows().
+
+    # Whether aggregates are slow enough that the dashboard should compute them off the
+    # Tk thread
+    background_queries = False
+
+    def close(self):
+        # Release what the dataset holds outside Python (database connections)
+        pass
+
+    def release_reader(self):
+        # Called by a worker thread when it has finished querying the dataset
+        pass
+
+    def track_source(self, columns, offset):
+        self.source_columns = columns
+        self.source_offset = offset
+        head_length = min(offset, dataset_cache.HASH_SAMPLE_BYTES)
+        self.source_head = (head_length, dataset_cache.head_hash(self.source_path, head_length))
+
+    def append_from_source(self):
+        # Tail the source file: parse only what was written after the last read and
+        # append it. Returns the number of new movies; raises SourceRewritten when the
+        # file was truncated or replaced instead.
+        size = os.path.getsize(self.source_path)
+        if size == self.source_offset:
+            return 0
+        head_length, head_hash = self.source_head
+        if size < self.source_offset or dataset_cache.head_hash(self.source_path, head_length) != head_hash:
+            raise SourceRewritten(self.source_path)
+
+        new_rows, self.source_offset = read_appended_rows(self.source_path, self.source_offset, self.source_columns)
+        if new_rows is None:
+            return 0
+        return self.append_rows(new_rows)
+
+    def append_csv(self, filepath):
+        # Append the movies from a separate delta file with the same columns
+        new_rows, _ = read_movies_csv(filepath)
+        return self.append_rows(new_rows)
+
+    def append_rows(self, new_rows):
+        raise NotImplementedError
+
+
+class MovieListing:
+    # The movies behind a table view, as row positions into the movie table. A view only
+    # fetches the window of rows it shows, optionally sorted by one column.
+
+    def __init__(self, df, rows):
+        self.df = df
+        self.rows = rows
+        self.sort_key = None
+        self.sort_order = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def fetch(self, columns, start, stop, sort_column=None, descending=False):
+        # One tuple of `columns` values per row at display positions start..stop
+        if sort_column is None:
+            window = self.rows[start:stop]
+        else:
+            if self.sort_key != (sort_column, descending):
+                values = self.df[sort_column].iloc[self.rows].reset_index(drop=True)
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    # Categoricals sort by category order, which appends leave unsorted
+                    values = values.cat.reorder_categories(values.cat.categories.sort_values())
+                self.sort_order = values.sort_values(ascending=not descending, kind='stable',
+                                                     na_position='last').index.to_numpy()
+                self.sort_key = (sort_column, descending)
+            window = self.rows[self.sort_order[start:stop]]
+        return list(zip(*[self.df[column].iloc[window].tolist() for column in columns]))
+
+
+class MovieDataset(AppendableDataset):
+    # A loaded movie table together with everything derived from it at load time
+
+    def __init__(self, df, genre_index=None, cast_index=None, search=None, fingerprint=None, source_path=None,
+                 overview=None):
+        # Token tables, the search index and the fingerprint can be passed in when restored
+        # from the disk cache; otherwise the search index is built from `overview` (if the
+        # file has one) and the titles
+        self.df = df.reset_index(drop=True)
+        self.years = self.df['year'].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.genre_index = genre_index or TokenIndex.from_series(self.df['genre'])
+        self.cast_index = cast_index or TokenIndex.from_series(self.df['cast'])
+        self.search = search or MovieSearch.from_tokens(*self.search_tokens(self.df['movie_name'], overview))
+        self.filters = FilterEngine(self.years, self.df['director'])
+        self.cube = AggregateCube.from_dataset(self)
+        self.count_directors()
+        self.source_path = source_path
+        self.source_columns = None
+        self.source_offset = 0
+        self.source_head = None
+        self.loaded_from_cache = False
+        self.memory_before = None
+
+        # Identifies this exact data so cached aggregates never outlive it
+        if fingerprint is None:
+            key_columns = ['movie_id', 'year', 'director', 'genre', 'cast']
+            fingerprint = int(pd.util.hash_pandas_object(self.df[key_columns], index=False).sum())
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.df)
+
+    def count_directors(self):
+        # Movies per director over the whole table, alphabetical, for the director dropdown
+        codes = self.filters.director_codes
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.filters.director_labels))
+        alphabetical = np.argsort(self.filters.director_labels.astype(str), kind='stable')
+        self.director_names = self.filters.director_labels[alphabetical]
+        self.director_movie_counts = counts[alphabetical]
+
+    @staticmethod
+    def search_tokens(titles, overview=None):
+        # Word tokens for the search index, splitting each distinct text only once
+        title_tokens = TokenIndex.from_series(titles.astype('category'), words=True)
+        if overview is None:
+            return title_tokens, None
+        return title_tokens, TokenIndex.from_series(overview.reset_index(drop=True).astype('category'), words=True)
+
+    def append_rows(self, new_rows):
+        # Add freshly parsed rows to the end of the table. Only the new rows are split,
+        # sorted and hashed: existing row positions and codes stay valid, so the indexes
+        # are extended in place instead of being rebuilt.
+        if len(new_rows) == 0:
+            return 0
+
+        self.search.extend(*self.search_tokens(new_rows['movie_name'], new_rows.get('overview')))
+        memory_before = frame_memory(new_rows.drop(columns=LAZY_COLUMNS, errors='ignore'))
+        new_rows = compact_movie_table(new_rows[self.df.columns])
+        old = self.df.copy(deep=False)
+        for column in self.df.columns:
+            if isinstance(old[column].dtype, pd.CategoricalDtype):
+                # Unseen values become new categories after the existing ones, so the
+                # existing codes (and the filter engine's director codes) are unchanged
+                categories = old[column].cat.categories
+                unseen = new_rows[column].cat.categories.difference(categories, sort=False)
+                old[column] = old[column].cat.add_categories(unseen)
+                new_rows[column] = new_rows[column].cat.set_categories(old[column].cat.categories)
+            else:
+                new_rows[column] = new_rows[column].astype(old[column].dtype)
+
+        first_row = len(old)
+        genre_tokens, cast_tokens = len(self.genre_index.rows), len(self.cast_index.rows)
+        self.df = pd.concat([old, new_rows], ignore_index=True)
+        self.years = np.concatenate((self.years, new_rows['year'].to_numpy(dtype=np.float64, na_value=np.nan)))
+        self.genre_index.extend(new_rows['genre'])
+        self.cast_index.extend(new_rows['cast'])
+        self.filters.extend(self.years[first_row:], new_rows['director'].cat.codes.to_numpy(),
+                            self.df['director'].cat.categories)
+        self.cube.add(self.years[first_row:], self.filters.director_codes[first_row:], len(self.filters.director_labels),
+                      (self.genre_index.rows[genre_tokens:] - first_row, self.genre_index.codes[genre_tokens:],
+                       len(self.genre_index.labels)),
+                      (self.cast_index.rows[cast_tokens:] - first_row, self.cast_index.codes[cast_tokens:]))
+        self.count_directors()
+
+        # The fingerprint is a sum of row hashes, so the new rows' hashes just add on
+        key_columns = ['movie_id', 'year', 'director', 'genre', 'cast']
+        added = int(pd.util.hash_pandas_object(new_rows[key_columns], index=False).sum())
+        self.fingerprint = (self.fingerprint + added) % 2 ** 64
+        if self.memory_before is not None:
+            self.memory_before += memory_before
+        return len(new_rows)
+
+    def directors_with_min_movies(self, min_movies):
+        return self.director_names[self.director_movie_counts >= min_movies].tolist()
+
+    def year_range(self):
+        # (first, last) year in the table, None if no movie has a year
+        years = self.filters.sorted_years
+        if len(years) == 0:
+            return None
+        return int(years[0]), int(years[-1])
+
+    def memory_summary(self):
+        after = frame_memory(self.df) / 1e6
+        if self.memory_before is None:
+            return f"Memory: {after:.1f} MB"
+        return f"Memory: {after:.1f} MB (was {self.memory_before / 1e6:.1f} MB)"
+
+    def select(self, year_min, year_max, director=None, search=None):
+        # Row positions in year order; `search` keeps only the movies matching that text
+        rows = self.filters.select(year_min, year_max, director)
+        if search:
+            matches = self.search.matches(search)
+            if matches is not None:
+                rows = rows[matches[rows]]
+        return rows
+
+    def suggest(self, query, n=10):
+        # (title, year) pairs for the search box's type-ahead list
+        rows = self.search.suggest(query, n)
+        years = [None if np.isnan(year) else int(year) for year in self.years[rows]]
+        return list(zip(self.df['movie_name'].iloc[rows].tolist(), years))
+
+    def count(self, rows):
+        # Number of movies in a selection from select()
+        return len(rows)
+
+    def top_actors(self, rows, n=10):
+        # Exact most cast actors over the selected rows
+        return self.cast_index.top(rows, n)
+
+    def subset_cube(self, rows):
+        # A cube over only the given rows, for selections the full cube cannot slice
+        # (search results). Built like the full one, from the token tables.
+        position = np.full(len(self.df), -1, dtype=np.int64)
+        position[rows] = np.arange(len(rows))
+        genre_rows = position[self.genre_index.rows]
+        cast_rows = position[self.cast_index.rows]
+        cube = AggregateCube()
+        cube.add(self.years[rows], self.filters.director_codes[rows], len(self.filters.director_labels),
+                 (genre_rows[genre_rows >= 0], self.genre_index.codes[genre_rows >= 0], len(self.genre_index.labels)),
+                 (cast_rows[cast_rows >= 0], self.cast_index.codes[cast_rows >= 0]))
+        return cube
+
+    def cube_years(self, cube, rows):
+        # The cube's year slice for rows from select(), which come in year order
+        if len(rows) == 0:
+            return slice(0, 0)
+        return cube.year_slice(self.years[rows[0]], self.years[rows[-1]])
+
+    def year_counts(self, cube, years, director_code=None):
+        years, counts = cube.year_counts(years, director_code)
+        return pd.Series(counts, index=years)
+
+    def top_directors(self, cube, years, n=10):
+        counts = cube.director_counts(years)
+        order = np.argsort(-counts, kind='stable')[:n]
+        order = order[counts[order] > 0]
+        return pd.Series(counts[order], index=self.filters.director_labels[order])
+
+    def aggregates(self, chart_type, rows, director=None, search=None):
+        # Everything a chart needs to draw itself for the selected rows. Counts come from
+        # the aggregate cube; only the movie table and the co-star network visit rows.
+        # Search results are not a year slice, so they get a cube of their own.
+        result = {'total': len(rows)}
+        cube = self.subset_cube(rows) if search and query_words(search) else self.cube
+        years = self.cube_years(cube, rows)
+        director_code = None if director is None else self.filters.director_lookup.get(director, -1)
+
+        if chart_type == "Movies by Year":
+            result['year_counts'] = self.year_counts(cube, years, director_code)
+            if len(rows) > EXACT_TOP_ACTORS_ROWS and cube is self.cube and director is None:
+                actors, counts = cube.top_actors(years, 5)
+                result['top_actors'] = pd.Series(counts, index=self.cast_index.labels[actors])
+                result['top_actors_estimated'] = True
+            else:
+                result['top_actors'] = self.cast_index.top(rows, 5)
+        elif chart_type == "Genre Distribution":
+            counts = cube.genre_counts(years, director_code)
+            order = np.argsort(-counts, kind='stable')[:10]
+            order = order[counts[order] > 0]
+            result['top_genres'] = pd.Series(counts[order], index=self.genre_index.labels[order])
+        elif chart_type == "Director Analysis":
+            if director is None:
+                result['director_counts'] = self.top_directors(cube, years)
+            else:
+                result['year_counts'] = self.year_counts(cube, years, director_code)
+
+            # The matching movies for the movie table, as row positions (a view, not a copy)
+            result['movies'] = MovieListing(self.df, rows)
+        elif chart_type == "Cast Network":
+            result['network'] = co_star_network(self.cast_index, rows)
+        elif chart_type == "Genre over Time":
+            result['genre_years'] = stacked_genre_table(cube.genre_year_counts(years, director_code),
+                                                        cube.years(years), self.genre_index.labels)
+        elif chart_type == "Director Genre Mix":
+            if director is None:
+                # The busiest directors in the range, side by side
+                names = self.top_directors(cube, years).index
+                counts = cube.director_genre_counts(years, [self.filters.director_lookup[name] for name in names])
+            else:
+                # The selected director against everyone over the years of their movies
+                names = [director, "All Directors"]
+                everyone = cube.genre_counts(years)
+                if cube is not self.cube and len(rows):
+                    # The search cube only holds this director's matches; everyone is every
+                    # match over the same years
+                    matches = self.select(self.years[rows[0]], self.years[rows[-1]], None, search)
+                    matches_cube = self.subset_cube(matches)
+                    everyone = matches_cube.genre_counts(self.cube_years(matches_cube, matches))
+                counts = np.vstack([cube.genre_counts(years, director_code), everyone])
+            result['director_genres'] = stacked_genre_table(counts, list(names), self.genre_index.labels)
+        else:
+            raise ValueError(f"Unknown chart type: {chart_type}")
+
+        return result
+
+
+class AggregateCache:
+    # Bounded LRU cache of computed chart aggregates, keyed by filter state
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        # The cached value, or None on a miss
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def summary(self):
+        return f"Cache: {self.hits} hits, {self.misses} misses"
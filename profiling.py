@@ -0,0 +1,135 @@
+import cProfile
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# Opt-in instrumentation for the dashboard's hot paths. A run (one redraw, one load) is a
+# list of named stages with wall time and the change in traced Python memory; stages can
+# nest, e.g. "plot" contains "layout" and "canvas". Finished runs are kept in a rolling
+# history for the diagnostics window.
+
+
+class ProfileRun:
+    def __init__(self, label, track_memory):
+        self.label = label
+        self.track_memory = track_memory
+        self.stages = []
+        self.depth = 0
+        self.started = time.perf_counter()
+        self.total = None
+
+    @contextmanager
+    def stage(self, name):
+        # Recorded when entered, so parents are listed before their children
+        record = {'name': name, 'depth': self.depth, 'seconds': 0.0, 'memory': None}
+        self.stages.append(record)
+        self.depth += 1
+        memory_before = tracemalloc.get_traced_memory()[0] if self.track_memory else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            if self.track_memory:
+                record['memory'] = tracemalloc.get_traced_memory()[0] - memory_before
+            self.depth -= 1
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def summary(self):
+        # One line for the status bar: top-level stages, nested ones in parentheses
+        parts = []
+        for record in self.stages:
+            text = f"{record['name']} {record['seconds'] * 1000:.1f} ms"
+            if record['depth'] == 0:
+                parts.append([text])
+            elif record['depth'] == 1 and parts:
+                parts[-1].append(text)
+        line = " | ".join(top[0] + (f" ({', '.join(top[1:])})" if len(top) > 1 else "") for top in parts)
+        return f"{line} | total {self.total * 1000:.1f} ms"
+
+    def details(self):
+        lines = [f"{self.label}: {self.total * 1000:.1f} ms total"]
+        for record in self.stages:
+            memory = ""
+            if record['memory'] is not None:
+                memory = f"  {record['memory'] / 1024:+.1f} KiB"
+            lines.append(f"{'    ' * (record['depth'] + 1)}{record['name']:<20} {record['seconds'] * 1000:9.2f} ms{memory}")
+        return "\n".join(lines)
+
+
+class _DisabledRun:
+    # Stand-in used while profiling is off, so callers never need to check
+
+    def stage(self, name):
+        return nullcontext()
+
+    def finish(self):
+        pass
+
+
+DISABLED_RUN = _DisabledRun()
+
+
+class StageProfiler:
+    def __init__(self, history_size=100):
+        self.enabled = False
+        self.history = deque(maxlen=history_size)
+        self.trace_path = None
+        self.active_trace = None
+        self._started_tracemalloc = False
+
+    def enable(self):
+        self.enabled = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def disable(self):
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def start_run(self, label):
+        if not self.enabled:
+            return DISABLED_RUN
+        return ProfileRun(label, tracemalloc.is_tracing())
+
+    def finish_run(self, run):
+        run.finish()
+        if run is not DISABLED_RUN:
+            self.history.append(run)
+
+    def last_run(self):
+        return self.history[-1] if self.history else None
+
+    def trace_next(self, path):
+        # Dump a cProfile trace of the next traced() block to `path`
+        self.trace_path = path
+
+    def postpone_trace(self):
+        # Called inside a traced() block that handed its work elsewhere (say to a
+        # background query): nothing is saved and the next traced() block is traced instead
+        if self.active_trace is not None:
+            self.trace_path = self.active_trace
+
+    @contextmanager
+    def traced(self):
+        path, self.trace_path = self.trace_path, None
+        if path is None:
+            yield None
+            return
+
+        profile = cProfile.Profile()
+        self.active_trace = path
+        profile.enable()
+        try:
+            yield path
+        finally:
+            profile.disable()
+            self.active_trace = None
+            if self.trace_path is None:
+                profile.dump_stats(path)
@@ -0,0 +1,153 @@
+import re
+
+import numpy as np
+
+# Inverted index over movie titles and overviews for the search box. Every word maps to
+# the sorted row positions of the movies containing it (its postings). Words are kept in
+# sorted order with their postings laid out in the same order, so all the words starting
+# with a prefix are one contiguous range of terms and one contiguous slice of postings:
+# type-ahead lookups never touch the text itself.
+
+# Words in titles and overviews, matched case-insensitively
+WORD_PATTERN = r'\w+'
+
+# Rows appended after load go into small extra segments; this many are merged into one
+MAX_SEGMENTS = 8
+
+
+def query_words(query):
+    # (word, prefix) pairs for a search string: the last word is still being typed, so it
+    # matches as a prefix unless the query ends with a space
+    words = re.findall(WORD_PATTERN, query.lower())
+    typing = bool(words) and not query[-1:].isspace()
+    return [(word, typing and i == len(words) - 1) for i, word in enumerate(words)]
+
+
+class InvertedIndex:
+    def __init__(self, terms, offsets, rows):
+        # Postings of terms[i] are rows[offsets[i]:offsets[i + 1]]
+        self.terms = terms
+        self.offsets = offsets
+        self.rows = rows
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros(0, dtype=object), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def from_tokens(cls, tokens, first_row=0):
+        # Invert a word TokenIndex (movie_data.TokenIndex.from_series(..., words=True)),
+        # whose rows are offset by `first_row`
+        if len(tokens.labels) == 0:
+            return cls.empty()
+        order = np.argsort(tokens.labels.astype(str), kind='stable')
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+
+        # Sorting (term, row) keys groups the postings by term with rows ascending; a word
+        # repeated within one movie is kept once
+        n_movies = max(tokens.n_movies, 1)
+        keys = np.sort(rank[tokens.codes] * n_movies + tokens.rows)
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        term_codes, rows = np.divmod(keys, n_movies)
+        counts = np.bincount(term_codes, minlength=len(order))
+        return cls(tokens.labels[order], np.concatenate(([0], np.cumsum(counts))), rows + first_row)
+
+    @classmethod
+    def merge(cls, segments):
+        # One index over several segments, given oldest (lowest rows) first
+        terms, inverse = np.unique(np.concatenate([segment.terms for segment in segments]).astype(str),
+                                   return_inverse=True)
+        codes = []
+        start = 0
+        for segment in segments:
+            n_terms = len(segment.terms)
+            codes.append(np.repeat(inverse[start:start + n_terms], np.diff(segment.offsets)))
+            start += n_terms
+        codes = np.concatenate(codes)
+        rows = np.concatenate([segment.rows for segment in segments])
+
+        # Stable, so each term's postings stay in segment order, which is row order
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes, minlength=len(terms))
+        return cls(terms.astype(object), np.concatenate(([0], np.cumsum(counts))), rows[order])
+
+    def term_range(self, word, prefix=False):
+        # [start, stop) of the terms equal to `word`, or starting with it
+        start = int(np.searchsorted(self.terms, word, side='left'))
+        if prefix:
+            stop = int(np.searchsorted(self.terms, word + '\U0010ffff', side='left'))
+        else:
+            stop = start + int(start < len(self.terms) and self.terms[start] == word)
+        return start, stop
+
+    def postings(self, word, prefix=False):
+        start, stop = self.term_range(word, prefix)
+        return self.rows[self.offsets[start]:self.offsets[stop]]
+
+
+class MovieSearch:
+    # Word search over the title and overview columns. Each column is a list of index
+    # segments: one built at load time, plus one per batch of appended rows until
+    # MAX_SEGMENTS are merged back into one.
+
+    def __init__(self, titles, overviews, n_movies):
+        self.titles = titles
+        self.overviews = overviews
+        self.n_movies = n_movies
+
+    @classmethod
+    def from_tokens(cls, title_tokens, overview_tokens=None):
+        overviews = InvertedIndex.empty() if overview_tokens is None else InvertedIndex.from_tokens(overview_tokens)
+        return cls([InvertedIndex.from_tokens(title_tokens)], [overviews], title_tokens.n_movies)
+
+    def extend(self, title_tokens, overview_tokens=None):
+        # Index movies appended after the existing ones
+        first_row = self.n_movies
+        self.titles.append(InvertedIndex.from_tokens(title_tokens, first_row))
+        if overview_tokens is not None:
+            self.overviews.append(InvertedIndex.from_tokens(overview_tokens, first_row))
+        self.n_movies += title_tokens.n_movies
+
+        if len(self.titles) > MAX_SEGMENTS:
+            self.titles = [InvertedIndex.merge(self.titles)]
+        if len(self.overviews) > MAX_SEGMENTS:
+            self.overviews = [InvertedIndex.merge(self.overviews)]
+
+    def merged(self):
+        # (title index, overview index) as single segments, e.g. for writing to the cache
+        self.titles = [InvertedIndex.merge(self.titles)] if len(self.titles) > 1 else self.titles
+        self.overviews = [InvertedIndex.merge(self.overviews)] if len(self.overviews) > 1 else self.overviews
+        return self.titles[0], self.overviews[0]
+
+    def word_mask(self, word, prefix, fields):
+        mask = np.zeros(self.n_movies, dtype=bool)
+        for segments in fields:
+            for segment in segments:
+                mask[segment.postings(word, prefix)] = True
+        return mask
+
+    def matches(self, query, titles_only=False):
+        # Boolean mask over movies containing every word of `query` in the title or the
+        # overview; None for a query without words (no filtering)
+        words = query_words(query)
+        if not words:
+            return None
+        fields = [self.titles] if titles_only else [self.titles, self.overviews]
+        mask = self.word_mask(*words[0], fields)
+        for word, prefix in words[1:]:
+            mask &= self.word_mask(word, prefix, fields)
+        return mask
+
+    def suggest(self, query, n=10):
+        # Row positions for the type-ahead list: title matches first, then movies that
+        # only match through their overview
+        in_title = self.matches(query, titles_only=True)
+        if in_title is None:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.flatnonzero(in_title)[:n]
+        if len(rows) < n:
+            anywhere = self.matches(query)
+            anywhere[rows] = False
+            rows = np.concatenate((rows, np.flatnonzero(anywhere)[:n - len(rows)]))
+        return rows
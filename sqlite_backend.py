@@ -0,0 +1,553 @@
+import bisect
+import json
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import dataset_cache
+from aggregate_cube import stacked_genre_table
+from movie_data import (AppendableDataset, TokenIndex, _untimed_stage, compact_movie_table,
+                        iter_movies_csv, read_csv_header)
+from search_index import query_words
+
+# On-disk backend for catalogues that do not fit in memory. The CSV is streamed once into
+# a SQLite database next to it (movies.csv -> movies.csv.sqlite) with indexes on year and
+# director and link tables for genres and cast. Filters and aggregates then run as
+# queries, so only the small results the charts draw are ever held in Python.
+
+DB_SUFFIX = '.sqlite'
+
+# Bump whenever the schema or the cleaning applied before inserting changes
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE directors (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, n_movies INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE genres (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE actors (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE movies (
+    id INTEGER PRIMARY KEY,  -- row position in the CSV
+    movie_id TEXT,
+    name TEXT,
+    year INTEGER,
+    director_id INTEGER REFERENCES directors (id)
+);
+CREATE TABLE movie_genres (movie INTEGER NOT NULL, genre_id INTEGER NOT NULL, PRIMARY KEY (movie, genre_id)) WITHOUT ROWID;
+CREATE TABLE movie_cast (movie INTEGER NOT NULL, actor_id INTEGER NOT NULL, PRIMARY KEY (movie, actor_id)) WITHOUT ROWID;
+-- Full-text index of titles and overviews (rowid = movie id); the text itself is not stored
+CREATE VIRTUAL TABLE movie_text USING fts5(
+    name, overview, content='', tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+);
+"""
+
+# Created after the bulk insert, which is much faster than maintaining them row by row
+INDEXES = """
+CREATE INDEX movies_year ON movies (year);
+CREATE INDEX movies_director_year ON movies (director_id, year);
+CREATE INDEX movies_name ON movies (name);
+CREATE INDEX movie_cast_actor ON movie_cast (actor_id, movie);
+"""
+
+# A filter pushed down as a WHERE clause; select() returns this instead of row positions
+Selection = namedtuple('Selection', ['year_min', 'year_max', 'director_id', 'search'], defaults=[None])
+
+
+def database_path(filepath):
+    return filepath + DB_SUFFIX
+
+
+def match_expression(query, column=None):
+    # FTS5 query for the same words as search_index.query_words: every word must appear,
+    # the last one as a prefix while it is being typed
+    words = query_words(query)
+    if not words:
+        return None
+    expression = " ".join(f'"{word}"' + ("*" if prefix else "") for word, prefix in words)
+    return f"{column} : ({expression})" if column else expression
+
+
+def _values(series):
+    # Column values as a list of Python objects with None for missing values
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+class Vocabulary:
+    # name -> id for one of the lookup tables (directors, genres, actors), read once and
+    # extended as new names turn up. Ids follow first appearance.
+
+    def __init__(self, connection, table):
+        self.connection = connection
+        self.table = table
+        self.ids = dict(connection.execute(f"SELECT name, id FROM {table}"))
+
+    def lookup(self, names):
+        new_names = [name for name in dict.fromkeys(names) if name not in self.ids]
+        if new_names:
+            first = len(self.ids)
+            self.connection.executemany(f"INSERT INTO {self.table} (id, name) VALUES (?, ?)",
+                                        enumerate(new_names, start=first))
+            self.ids.update((name, code) for code, name in enumerate(new_names, start=first))
+        return np.array([self.ids[name] for name in names], dtype=np.int64)
+
+
+def insert_movies(connection, df, first_row, vocabularies):
+    # Insert cleaned movie rows as ids first_row, first_row + 1, ...; returns the sum of
+    # their row hashes for the dataset fingerprint
+    df = compact_movie_table(df, arrow_strings=False).reset_index(drop=True)
+    movies = first_row + np.arange(len(df))
+
+    # Directors: one id per category, then per movie through the category codes
+    directors = df['director']
+    director_ids = vocabularies['directors'].lookup(directors.cat.categories.tolist())
+    codes = directors.cat.codes.to_numpy()
+    movie_directors = pd.Series(np.where(codes >= 0, director_ids[np.maximum(codes, 0)], -1))
+    connection.executemany(
+        "INSERT INTO movies (id, movie_id, name, year, director_id) VALUES (?, ?, ?, ?, ?)",
+        zip(movies.tolist(), _values(df['movie_id']), _values(df['movie_name']), _values(df['year']),
+            _values(movie_directors.where(movie_directors >= 0))),
+    )
+    overview = _values(df['overview']) if 'overview' in df else [None] * len(df)
+    connection.executemany("INSERT INTO movie_text (rowid, name, overview) VALUES (?, ?, ?)",
+                           zip(movies.tolist(), _values(df['movie_name']), overview))
+    counts = movie_directors[movie_directors >= 0].value_counts()
+    connection.executemany("UPDATE directors SET n_movies = n_movies + ? WHERE id = ?",
+                           zip(counts.tolist(), counts.index.tolist()))
+
+    # Genres and cast: split with the same tokenizer as the in-memory backend
+    for column, table, vocabulary in [('genre', 'movie_genres', 'genres'), ('cast', 'movie_cast', 'actors')]:
+        tokens = TokenIndex.from_series(df[column])
+        token_ids = vocabularies[vocabulary].lookup(tokens.labels.tolist())
+        id_column = 'genre_id' if column == 'genre' else 'actor_id'
+        connection.executemany(f"INSERT OR IGNORE INTO {table} (movie, {id_column}) VALUES (?, ?)",
+                               zip(movies[tokens.rows].tolist(), token_ids[tokens.codes].tolist()))
+
+    key_columns = ['movie_id', 'year', 'director', 'genre', 'cast']
+    return int(pd.util.hash_pandas_object(df[key_columns], index=False).sum())
+
+
+def _vocabularies(connection):
+    return {table: Vocabulary(connection, table) for table in ['directors', 'genres', 'actors']}
+
+
+def _write_meta(connection, **values):
+    connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                           [(key, json.dumps(value)) for key, value in values.items()])
+
+
+def build_database(filepath, path, progress=None, cancel_event=None):
+    # Stream the CSV into a fresh database. It is written under a temporary name and
+    # only moved into place once complete, so a cancelled build never gets reused.
+    temp_path = path + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    connection = sqlite3.connect(temp_path)
+    try:
+        # Nothing to protect during a build: a crash just means building again
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(SCHEMA)
+
+        vocabularies = _vocabularies(connection)
+        n_movies = 0
+        fingerprint = 0
+        bytes_read = 0
+        with connection:
+            for chunk, bytes_read in iter_movies_csv(filepath, progress, cancel_event):
+                fingerprint += insert_movies(connection, chunk, n_movies, vocabularies)
+                n_movies += len(chunk)
+            connection.executescript(INDEXES)
+            _write_meta(connection, version=SCHEMA_VERSION, source=dataset_cache.source_key(filepath),
+                        columns=read_csv_header(filepath), source_offset=bytes_read,
+                        n_movies=n_movies, fingerprint=fingerprint % 2 ** 64)
+        connection.execute("ANALYZE")
+        connection.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        connection.close()
+        os.remove(temp_path)
+        raise
+
+
+def read_meta(path):
+    # The database's meta table as a dict, or None if there is no usable database
+    if not os.path.exists(path):
+        return None
+    try:
+        connection = sqlite3.connect(path)
+        try:
+            return {key: json.loads(value) for key, value in connection.execute("SELECT key, value FROM meta")}
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+
+
+def load_sqlite_dataset(filepath, progress=None, cancel_event=None, use_cache=True, stage=_untimed_stage):
+    # Open the database built from `filepath`, building it first if it is missing or no
+    # longer matches the file. Same signature as movie_data.load_dataset.
+    path = database_path(filepath)
+    meta = None
+    if use_cache:
+        with stage('check database'):
+            meta = read_meta(path)
+            if meta is not None and (meta.get('version') != SCHEMA_VERSION
+                                     or meta.get('source') != dataset_cache.source_key(filepath)):
+                meta = None
+
+    if meta is None:
+        with stage('build database'):
+            build_database(filepath, path, progress, cancel_event)
+
+    with stage('open database'):
+        dataset = SQLiteDataset(path, filepath)
+    dataset.loaded_from_cache = meta is not None
+    return dataset
+
+
+class SQLiteListing:
+    # The movies behind a table view, fetched from the database one window at a time.
+    # Unsorted listings are in year order (like MovieDataset.select) and read straight
+    # off the year index, seeking past the (year, id) key of a row already fetched
+    # rather than counting rows with OFFSET. A sorted listing is first written, in order,
+    # to a temporary table; every window after that is a rowid range, however far down
+    # it is.
+
+    COLUMNS = {'year': 'm.year', 'movie_name': 'm.name', 'director': 'd.name'}
+
+    def __init__(self, dataset, where, params, total):
+        self.dataset = dataset
+        self.where = where
+        self.params = params
+        self.total = total
+
+        # (year, id) of the row just before each listing position seen so far, so a window
+        # starting at or just after one of them is a seek on the index
+        self.positions = [0]
+        self.keys = [None]
+
+    def __len__(self):
+        return self.total
+
+    def fetch_in_year_order(self, fields, start, stop):
+        # Seek to the nearest known key at or before `start`; only a jump past every
+        # window fetched so far skips rows
+        nearest = bisect.bisect_right(self.positions, start) - 1
+        where, params = self.where, list(self.params)
+        if self.keys[nearest] is not None:
+            where += " AND (m.year, m.id) > (?, ?)"
+            params += list(self.keys[nearest])
+        rows = self.dataset.connection.execute(
+            f"SELECT {fields}, m.year, m.id FROM movies m LEFT JOIN directors d ON d.id = m.director_id "
+            f"WHERE {where} ORDER BY m.year, m.id LIMIT ? OFFSET ?",
+            params + [stop - start, start - self.positions[nearest]],
+        ).fetchall()
+
+        for i, row in enumerate(rows, start + 1):
+            at = bisect.bisect_left(self.positions, i)
+            if at == len(self.positions) or self.positions[at] != i:
+                self.positions.insert(at, i)
+                self.keys.insert(at, row[-2:])
+        return [row[:-2] for row in rows]
+
+    def fetch(self, columns, start, stop, sort_column=None, descending=False):
+        connection = self.dataset.connection
+        fields = ", ".join(self.COLUMNS[column] for column in columns)
+        if sort_column is None:
+            return self.fetch_in_year_order(fields, start, stop)
+
+        # One sorted listing is kept per connection, the one most recently viewed
+        key = (self.where, tuple(self.params), sort_column, descending)
+        if self.dataset.sorted_listing != key:
+            expression = self.COLUMNS[sort_column]
+            connection.execute("DROP TABLE IF EXISTS temp.sorted_listing")
+            connection.execute(
+                f"CREATE TEMP TABLE sorted_listing AS SELECT m.id AS movie FROM movies m "
+                f"LEFT JOIN directors d ON d.id = m.director_id WHERE {self.where} "
+                f"ORDER BY {expression} IS NULL, {expression} {'DESC' if descending else 'ASC'}, m.year, m.id",
+                self.params)
+            self.dataset.sorted_listing = key
+        return connection.execute(
+            f"SELECT {fields} FROM temp.sorted_listing s JOIN movies m ON m.id = s.movie "
+            f"LEFT JOIN directors d ON d.id = m.director_id WHERE s.rowid > ? AND s.rowid <= ? ORDER BY s.rowid",
+            (start, stop),
+        ).fetchall()
+
+
+class SQLiteDataset(AppendableDataset):
+    # Same query interface as movie_data.MovieDataset, answered by the database
+
+    # Aggregates can take seconds on a large catalogue, so the dashboard runs them off
+    # the Tk thread
+    background_queries = True
+
+    def __init__(self, path, source_path):
+        # Opened on the loading thread and used afterwards by the UI thread, never by both
+        # at once, so the connection may cross threads. Queries from any other thread go
+        # through a connection of that thread's own (see reader()).
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.readers = threading.local()
+        self.reader_connections = []
+        self.path = path
+        self.source_path = source_path
+        self.loaded_from_cache = False
+        self.memory_before = None
+        self.vocabularies = None
+        self.sorted_listing = None
+
+        meta = {key: json.loads(value) for key, value in self.connection.execute("SELECT key, value FROM meta")}
+        self.n_movies = meta['n_movies']
+        self.fingerprint = meta['fingerprint']
+        self.track_source(meta['columns'], meta['source_offset'])
+        self.count_directors()
+
+    def __len__(self):
+        return self.n_movies
+
+    def reader(self):
+        # The connection for queries on the calling thread. Worker threads each get their
+        # own, so a long aggregate never holds up the UI thread's paging and type-ahead
+        if threading.current_thread() is threading.main_thread():
+            return self.connection
+        connection = getattr(self.readers, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.readers.connection = connection
+            self.reader_connections.append(connection)
+        return connection
+
+    def release_reader(self):
+        # Close the calling worker thread's connection once its queries are done, so
+        # short-lived query threads do not leave a connection each behind
+        connection = getattr(self.readers, 'connection', None)
+        if connection is None:
+            return
+        self.readers.connection = None
+        if connection in self.reader_connections:
+            self.reader_connections.remove(connection)
+        connection.close()
+
+    def close(self):
+        for connection in [self.connection] + self.reader_connections:
+            connection.close()
+        self.reader_connections = []
+
+    def count_directors(self):
+        # Movies per director, alphabetical, for the director dropdown
+        rows = self.connection.execute("SELECT name, n_movies FROM directors ORDER BY name").fetchall()
+        self.director_names = np.array([name for name, _ in rows], dtype=object)
+        self.director_movie_counts = np.array([count for _, count in rows], dtype=np.int64)
+
+    def directors_with_min_movies(self, min_movies):
+        return self.director_names[self.director_movie_counts >= min_movies].tolist()
+
+    def year_range(self):
+        first, last = self.query("SELECT MIN(year), MAX(year) FROM movies", [])[0]
+        if first is None:
+            return None
+        return first, last
+
+    def memory_summary(self):
+        return f"Database: {os.path.getsize(self.path) / 1e6:.1f} MB on disk"
+
+    def append_rows(self, new_rows):
+        # Appended rows are inserted like any other chunk and the meta updated in the same
+        # transaction, so the database stays valid for the grown file on the next start
+        if len(new_rows) == 0:
+            return 0
+        if self.vocabularies is None:
+            self.vocabularies = _vocabularies(self.connection)
+
+        self.sorted_listing = None
+        with self.connection:
+            added = insert_movies(self.connection, new_rows, self.n_movies, self.vocabularies)
+            self.n_movies += len(new_rows)
+            self.fingerprint = (self.fingerprint + added) % 2 ** 64
+            _write_meta(self.connection, source=dataset_cache.source_key(self.source_path),
+                        source_offset=self.source_offset, n_movies=self.n_movies, fingerprint=self.fingerprint)
+        self.count_directors()
+        return len(new_rows)
+
+    def select(self, year_min, year_max, director=None, search=None):
+        director_id = None
+        if director is not None:
+            rows = self.query("SELECT id FROM directors WHERE name = ?", [director])
+            director_id = rows[0][0] if rows else -1
+        return Selection(year_min, year_max, director_id, match_expression(search or ""))
+
+    def where(self, selection):
+        # WHERE clause over `movies m` plus its parameters
+        clause = "m.year BETWEEN ? AND ?"
+        params = [int(selection.year_min), int(selection.year_max)]
+        if selection.director_id is not None:
+            clause += " AND m.director_id = ?"
+            params.append(selection.director_id)
+        if selection.search is not None:
+            clause += " AND m.id IN (SELECT rowid FROM movie_text WHERE movie_text MATCH ?)"
+            params.append(selection.search)
+        return clause, params
+
+    def suggest(self, query, n=10):
+        # (title, year) pairs for the search box's type-ahead list: title matches first,
+        # then movies that only match through their overview
+        suggestions = []
+        seen = set()
+        for expression in [match_expression(query, 'name'), match_expression(query)]:
+            if expression is None or len(suggestions) >= n:
+                break
+            for movie, name, year in self.query(
+                    "SELECT m.id, m.name, m.year FROM movie_text JOIN movies m ON m.id = movie_text.rowid "
+                    "WHERE movie_text MATCH ? ORDER BY m.id LIMIT ?", [expression, n]):
+                if movie not in seen and len(suggestions) < n:
+                    seen.add(movie)
+                    suggestions.append((name, year))
+        return suggestions
+
+    def query(self, sql, params):
+        return self.reader().execute(sql, params).fetchall()
+
+    def year_counts(self, where, params):
+        rows = self.query(f"SELECT m.year, COUNT(*) FROM movies m WHERE {where} GROUP BY m.year ORDER BY m.year", params)
+        return pd.Series([count for _, count in rows], index=[year for year, _ in rows], dtype=np.int64)
+
+    def year_span(self, where, params):
+        # First and last year of the selected movies; an empty range if there are none
+        first, last = self.query(f"SELECT MIN(m.year), MAX(m.year) FROM movies m WHERE {where}", params)[0]
+        if first is None:
+            return 0, -1
+        return first, last
+
+    def genre_counts(self, group, where, params, joins=""):
+        # Genre tokens per `group` expression (rows) and genre (columns) as a DataFrame
+        rows = self.query(
+            f"SELECT {group}, g.name, COUNT(*) FROM movies m {joins}"
+            f"JOIN movie_genres mg ON mg.movie = m.id JOIN genres g ON g.id = mg.genre_id "
+            f"WHERE {where} GROUP BY 1, mg.genre_id", params)
+        counts = pd.DataFrame(rows, columns=['group', 'genre', 'n'])
+        return counts.pivot_table(index='group', columns='genre', values='n', aggfunc='sum', fill_value=0)
+
+    def top_counts(self, sql, params, n):
+        # (label, count) rows from a grouped query as a Series, highest first
+        rows = self.query(sql + " ORDER BY n DESC, label LIMIT ?", params + [n])
+        return pd.Series([count for _, count in rows], index=[label for label, _ in rows], dtype=np.int64)
+
+    def count(self, rows):
+        # Number of movies in a selection from select()
+        where, params = self.where(rows)
+        return self.query(f"SELECT COUNT(*) FROM movies m WHERE {where}", params)[0][0]
+
+    def top_actors(self, rows, n=10):
+        # Most cast actors over the selection
+        where, params = self.where(rows)
+        return self.top_counts(
+            f"SELECT a.name AS label, COUNT(*) AS n FROM movies m JOIN movie_cast c ON c.movie = m.id "
+            f"JOIN actors a ON a.id = c.actor_id WHERE {where} GROUP BY c.actor_id", params, n)
+
+    def aggregates(self, chart_type, rows, director=None, search=None):
+        # Everything a chart needs to draw itself for the selection; same keys as
+        # MovieDataset.aggregates. A search is already part of the selection.
+        where, params = self.where(rows)
+        total = self.query(f"SELECT COUNT(*) FROM movies m WHERE {where}", params)[0][0]
+        result = {'total': total}
+
+        if chart_type == "Movies by Year":
+            result['year_counts'] = self.year_counts(where, params)
+            result['top_actors'] = self.top_actors(rows, 5)
+        elif chart_type == "Genre Distribution":
+            result['top_genres'] = self.top_counts(
+                f"SELECT g.name AS label, COUNT(*) AS n FROM movies m "
+                f"JOIN movie_genres mg ON mg.movie = m.id JOIN genres g ON g.id = mg.genre_id "
+                f"WHERE {where} GROUP BY mg.genre_id", params, 10)
+        elif chart_type == "Director Analysis":
+            if director is None:
+                result['director_counts'] = self.top_counts(
+                    f"SELECT d.name AS label, COUNT(*) AS n FROM movies m JOIN directors d ON d.id = m.director_id "
+                    f"WHERE {where} GROUP BY m.director_id", params, 10)
+            else:
+                result['year_counts'] = self.year_counts(where, params)
+            result['movies'] = SQLiteListing(self, where, params, total)
+        elif chart_type == "Cast Network":
+            result['network'] = self.co_star_network(where, params)
+        elif chart_type == "Genre over Time":
+            # Every year from the first to the last selected movie, as in the in-memory cube
+            first, last = self.year_span(where, params)
+            counts = self.genre_counts("m.year", where, params).reindex(range(first, last + 1), fill_value=0)
+            result['genre_years'] = stacked_genre_table(counts.to_numpy(), counts.index, counts.columns)
+        elif chart_type == "Director Genre Mix":
+            if director is None:
+                # The busiest directors in the range, side by side
+                names = self.top_counts(
+                    f"SELECT d.name AS label, COUNT(*) AS n FROM movies m JOIN directors d ON d.id = m.director_id "
+                    f"WHERE {where} GROUP BY m.director_id", params, 10).index.tolist()
+                marks = ", ".join("?" * len(names))
+                counts = self.genre_counts("d.name", f"{where} AND d.name IN ({marks})", params + names,
+                                          "JOIN directors d ON d.id = m.director_id ").reindex(names, fill_value=0)
+            else:
+                # The selected director against everyone over the years of their movies
+                everyone, everyone_params = self.where(Selection(*self.year_span(where, params), None, rows.search))
+                names = [director, "All Directors"]
+                counts = pd.concat([self.genre_counts("0", where, params), self.genre_counts("0", everyone, everyone_params)],
+                                   keys=names).droplevel(1).reindex(names).fillna(0).astype(np.int64)
+            result['director_genres'] = stacked_genre_table(counts.to_numpy(), counts.index, counts.columns)
+        else:
+            raise ValueError(f"Unknown chart type: {chart_type}")
+
+        return result
+
+    def co_star_network(self, where, params, top_n=15, top_pairs=10):
+        # Same result as cast_network.co_star_network, computed with self-joins of the
+        # cast table; only the top actors' neighbourhoods come back to Python
+        top = self.query(
+            f"SELECT t.actor_id, a.name, t.n, t.n_actors FROM ("
+            f"  SELECT c.actor_id, COUNT(*) AS n, COUNT(*) OVER () AS n_actors"
+            f"  FROM movies m JOIN movie_cast c ON c.movie = m.id WHERE {where}"
+            f"  GROUP BY c.actor_id ORDER BY n DESC, c.actor_id LIMIT ?"
+            f") t JOIN actors a ON a.id = t.actor_id ORDER BY t.n DESC, t.actor_id", params + [top_n])
+
+        pairs = self.query(
+            f"SELECT na.name, nb.name, t.n, t.n_edges FROM ("
+            f"  SELECT a.actor_id AS actor_a, b.actor_id AS actor_b, COUNT(*) AS n, COUNT(*) OVER () AS n_edges"
+            f"  FROM movies m JOIN movie_cast a ON a.movie = m.id"
+            f"  JOIN movie_cast b ON b.movie = m.id AND b.actor_id > a.actor_id"
+            f"  WHERE {where} GROUP BY a.actor_id, b.actor_id ORDER BY n DESC, a.actor_id, b.actor_id LIMIT ?"
+            f") t JOIN actors na ON na.id = t.actor_a JOIN actors nb ON nb.id = t.actor_b"
+            f" ORDER BY t.n DESC, t.actor_a, t.actor_b", params + [top_pairs])
+
+        # Every co-star of the top actors, for their degrees and the subgraph between them
+        top_ids = [actor_id for actor_id, _, _, _ in top]
+        position = {actor_id: i for i, actor_id in enumerate(top_ids)}
+        degree = np.zeros(len(top_ids), dtype=np.int64)
+        weighted_degree = np.zeros(len(top_ids), dtype=np.int64)
+        subgraph = np.zeros((len(top_ids), len(top_ids)), dtype=np.int64)
+        if top_ids:
+            marks = ", ".join("?" * len(top_ids))
+            neighbours = self.query(
+                f"SELECT a.actor_id, b.actor_id, COUNT(*) FROM movie_cast a JOIN movies m ON m.id = a.movie"
+                f" JOIN movie_cast b ON b.movie = a.movie AND b.actor_id != a.actor_id"
+                f" WHERE a.actor_id IN ({marks}) AND {where} GROUP BY a.actor_id, b.actor_id", top_ids + params)
+            for actor_a, actor_b, count in neighbours:
+                i = position[actor_a]
+                degree[i] += 1
+                weighted_degree[i] += count
+                if actor_b in position:
+                    subgraph[i, position[actor_b]] = count
+
+        return {
+            'n_actors': top[0][3] if top else 0,
+            'n_edges': pairs[0][3] if pairs else 0,
+            'centrality': pd.DataFrame({
+                'movies': [count for _, _, count, _ in top],
+                'co_stars': degree,
+                'weighted_degree': weighted_degree,
+            }, index=[name for _, name, _, _ in top], dtype=np.int64),
+            'pairs': pd.DataFrame({
+                'actor_a': [a for a, _, _, _ in pairs],
+                'actor_b': [b for _, b, _, _ in pairs],
+                'movies': [count for _, _, count, _ in pairs],
+            }),
+            'subgraph': subgraph,
+        }
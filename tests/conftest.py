@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+# The catalogue shipped with the dashboard
+BUNDLED_CSV = os.path.join(REPO, 'IMDB-Movie-Dataset.csv')
+
+
+@pytest.fixture(scope='session')
+def catalogue():
+    return pd.read_csv(BUNDLED_CSV)
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    # Write a frame to a CSV in the test's directory (the loaders put their caches next
+    # to it); append=True adds the rows to the end of an existing file instead
+    def write(name, frame, append=False):
+        path = str(tmp_path / name)
+        frame.to_csv(path, index=False, mode='a' if append else 'w', header=not append)
+        return path
+    return write
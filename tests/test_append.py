@@ -0,0 +1,105 @@
+import pytest
+
+from backends import BACKENDS
+from movie_data import CHART_TYPES
+
+# Rows loaded before the rest of the catalogue is appended
+SPLIT = 1800
+
+# Year ranges and directors the appended and freshly loaded data are compared over
+FILTERS = [(None, None, None), (1990, 2005, None), (2018, 2026, None),
+           (None, None, "David Dhawan"), (1980, 2000, "Yash Chopra")]
+
+
+def counts(series):
+    return {label: int(count) for label, count in series.items()}
+
+
+def same_top(appended, fresh):
+    # Top-N lists may order or cut ties differently; everything above the cut must agree
+    appended, fresh = counts(appended), counts(fresh)
+    assert sorted(appended.values()) == sorted(fresh.values())
+    cut = min(fresh.values(), default=0)
+    assert {k: v for k, v in appended.items() if v > cut} == {k: v for k, v in fresh.items() if v > cut}
+
+
+def movie_lines(listing):
+    return sorted(map(str, listing.fetch(['movie_name', 'year', 'director'], 0, len(listing))))
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def datasets(request, catalogue, write_csv):
+    # (dataset loaded from the first SPLIT rows with the rest appended to the file,
+    #  dataset loaded from the whole catalogue)
+    loader = BACKENDS[request.param]
+    appended_path = write_csv('appended.csv', catalogue.iloc[:SPLIT])
+    appended = loader(appended_path, use_cache=False)
+    write_csv('appended.csv', catalogue.iloc[SPLIT:], append=True)
+    assert appended.append_from_source() == len(catalogue) - SPLIT
+
+    fresh = loader(write_csv('fresh.csv', catalogue), use_cache=False)
+    return appended, fresh
+
+
+def test_append_matches_fresh_load(datasets, catalogue):
+    appended, fresh = datasets
+    assert len(appended) == len(fresh)
+    assert appended.fingerprint == fresh.fingerprint
+    assert appended.year_range() == fresh.year_range()
+
+    # Per-director totals include movies without a year
+    expected = counts(catalogue['director'].value_counts())
+    for dataset in datasets:
+        assert dict(zip(dataset.director_names, dataset.director_movie_counts.tolist())) == expected
+    assert appended.directors_with_min_movies(5) == fresh.directors_with_min_movies(5)
+
+
+@pytest.mark.parametrize('year_min, year_max, director', FILTERS)
+def test_appended_aggregates_match(datasets, year_min, year_max, director):
+    appended, fresh = datasets
+    first, last = fresh.year_range()
+    year_min, year_max = year_min or first, year_max or last
+    rows = appended.select(year_min, year_max, director)
+    for chart_type in CHART_TYPES:
+        result = appended.aggregates(chart_type, rows, director)
+        expected = fresh.aggregates(chart_type, fresh.select(year_min, year_max, director), director)
+        assert result['total'] == expected['total']
+        if 'year_counts' in expected:
+            assert counts(result['year_counts']) == counts(expected['year_counts'])
+        if 'top_genres' in expected:
+            same_top(result['top_genres'], expected['top_genres'])
+        if 'director_counts' in expected:
+            same_top(result['director_counts'], expected['director_counts'])
+        if 'top_actors' in expected:
+            # The "Most Cast" line shows exact counts, the same as top_actors() (and /api/actors)
+            assert counts(result['top_actors']) == counts(appended.top_actors(rows, 5))
+            same_top(result['top_actors'], expected['top_actors'])
+        if 'movies' in expected:
+            assert movie_lines(result['movies']) == movie_lines(expected['movies'])
+
+
+def test_appended_listing_sorts_by_value(datasets):
+    # Appends add new directors after the existing ones; sorting must still be alphabetical
+    for descending in [False, True]:
+        listed = []
+        for dataset in datasets:
+            first, last = dataset.year_range()
+            movies = dataset.aggregates("Director Analysis", dataset.select(first, last), None)['movies']
+            listed.append([director for director, in
+                           movies.fetch(['director'], 0, len(movies), sort_column='director', descending=descending)])
+        assert listed[0] == listed[1]
+        assert listed[0] == sorted(listed[0], reverse=descending)
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+def test_appended_row_with_extra_field(backend, catalogue, write_csv):
+    # A full load drops the extra field and keeps the row's columns; so must an append
+    path = write_csv('extra.csv', catalogue.iloc[:100])
+    dataset = BACKENDS[backend](path, use_cache=False)
+    with open(path, 'a') as handle:
+        handle.write("9999,tt9999999,Extra Field,2020,Drama,An overview,Test Director,A|B,EXTRA\n")
+    assert dataset.append_from_source() == 1
+
+    rows = dataset.select(2020, 2020, "Test Director")
+    movies = dataset.aggregates("Director Analysis", rows, "Test Director")['movies']
+    assert movies.fetch(['movie_name', 'year', 'director'], 0, len(movies)) == [("Extra Field", 2020, "Test Director")]
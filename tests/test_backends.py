@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from backends import BACKENDS
+
+# (director, search) pairs the backends are compared over
+FILTERS = [(None, ""), ("Yash Chopra", ""), ("Yash Chopra", "love "), ("David Dhawan", "no"),
+           (None, "police officer"), ("Priyadarshan", "comedy")]
+
+
+@pytest.fixture(scope='module')
+def datasets(catalogue, tmp_path_factory):
+    # The bundled catalogue loaded by every backend
+    path = str(tmp_path_factory.mktemp('backends') / 'movies.csv')
+    catalogue.to_csv(path, index=False)
+    return {name: loader(path, use_cache=False) for name, loader in BACKENDS.items()}
+
+
+def genre_rows(table):
+    # {row: {genre: count}} without "Other", whose share depends on how ties are cut
+    return {row: {genre: int(count) for genre, count in counts.items() if genre != 'Other'}
+            for row, counts in table.iterrows()}
+
+
+@pytest.mark.parametrize('director, search', FILTERS)
+def test_director_genre_mix_matches(datasets, director, search):
+    tables = {}
+    for name, dataset in datasets.items():
+        first, last = dataset.year_range()
+        rows = dataset.select(first, last, director, search)
+        tables[name] = dataset.aggregates("Director Genre Mix", rows, director, search)['director_genres']
+
+    memory, sqlite = tables['memory'], tables['sqlite']
+    assert list(memory.index) == list(sqlite.index)
+    assert memory.sum(axis=1).tolist() == sqlite.sum(axis=1).tolist()
+    memory_rows, sqlite_rows = genre_rows(memory), genre_rows(sqlite)
+    for row in memory_rows:
+        shared = memory_rows[row].keys() & sqlite_rows[row].keys()
+        assert {genre: memory_rows[row][genre] for genre in shared} == {genre: sqlite_rows[row][genre] for genre in shared}
+
+
+@pytest.mark.parametrize('director, search', FILTERS)
+def test_movies_by_year_matches(datasets, director, search):
+    # Year counts and the "Most Cast" line
+    results = {}
+    for name, dataset in datasets.items():
+        first, last = dataset.year_range()
+        rows = dataset.select(first, last, director, search)
+        results[name] = dataset.aggregates("Movies by Year", rows, director, search)
+
+    memory, sqlite = results['memory'], results['sqlite']
+    assert memory['total'] == sqlite['total']
+    assert memory['year_counts'].to_dict() == sqlite['year_counts'].to_dict()
+    # Ties at the cut may pick different actors
+    memory_top, sqlite_top = memory['top_actors'].to_dict(), sqlite['top_actors'].to_dict()
+    assert sorted(memory_top.values()) == sorted(sqlite_top.values())
+    cut = min(memory_top.values(), default=0)
+    assert {k: v for k, v in memory_top.items() if v > cut} == {k: v for k, v in sqlite_top.items() if v > cut}
+
+
+def test_query_threads_release_their_connections(datasets):
+    # Each chart query on the dashboard runs on a thread of its own
+    dataset = datasets['sqlite']
+    first, last = dataset.year_range()
+
+    def query():
+        dataset.aggregates("Movies by Year", dataset.select(first, last, None, ""), None, "")
+        dataset.release_reader()
+
+    for _ in range(20):
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+    assert dataset.reader_connections == []
@@ -0,0 +1,135 @@
+import tkinter as tk
+from tkinter import ttk
+
+import pandas as pd
+
+# Treeview geometry used until the real one can be measured (the row height depends on
+# the theme, font and display scaling)
+ROW_HEIGHT = 20
+HEADING_HEIGHT = 25
+
+
+class VirtualTable(tk.Frame):
+    # Sortable table for very large result sets. The rows come from a listing (see
+    # movie_data.MovieListing) that hands out one window of rows at a time; the Treeview
+    # only ever holds items for the lines currently on screen, and scrolling just rewrites
+    # those items with the next window.
+
+    def __init__(self, master, columns, **kwargs):
+        # `columns` is a list of (heading, width, listing column) triples
+        super().__init__(master, **kwargs)
+        self.column_names = [name for name, _, _ in columns]
+        self.fields = {name: field for name, _, field in columns}
+
+        self.tree = ttk.Treeview(self, columns=self.column_names, show='headings', selectmode='browse', height=10)
+        for name, width, _ in columns:
+            self.tree.heading(name, text=name, command=lambda column=name: self.sort_by(column))
+            self.tree.column(name, width=width, anchor=tk.W, stretch=(name == self.column_names[-1]))
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.listing = []
+        self.offset = 0
+        self.visible_rows = 10
+        self.sort_column = None
+        self.sort_descending = False
+
+        self.tree.bind('<Configure>', self.on_configure)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll_to(self.offset - 3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_to(self.offset + 3))
+        self.tree.bind('<Prior>', lambda event: self.scroll_to(self.offset - self.visible_rows))
+        self.tree.bind('<Next>', lambda event: self.scroll_to(self.offset + self.visible_rows))
+        self.tree.bind('<Home>', lambda event: self.scroll_to(0))
+        self.tree.bind('<End>', lambda event: self.scroll_to(len(self.listing)))
+
+    def set_listing(self, listing):
+        self.listing = listing
+        self.offset = 0
+        self.sort_column = None
+        self.sort_descending = False
+        self.update_headings()
+        self.refresh()
+
+    def sort_by(self, name):
+        # Clicking the same heading again flips the direction
+        descending = self.sort_column == name and not self.sort_descending
+        self.sort_column = name
+        self.sort_descending = descending
+        self.offset = 0
+        self.update_headings()
+        self.refresh()
+
+    def update_headings(self):
+        for name in self.column_names:
+            arrow = ""
+            if name == self.sort_column:
+                arrow = " ▼" if self.sort_descending else " ▲"
+            self.tree.heading(name, text=name + arrow)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), len(self.listing) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(float(amount) * len(self.listing))
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_to(self.offset + int(amount) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll_to(self.offset - int(event.delta / 120) * 3)
+
+    def line_geometry(self):
+        # (heading height, row height) in pixels: measured from the first line on screen
+        # when there is one, else the style's row height
+        items = self.tree.get_children()
+        try:
+            if items:
+                box = self.tree.bbox(items[0])
+                if box and int(box[3]) > 0:
+                    return int(box[1]), int(box[3])
+            row_height = ttk.Style(self).lookup('Treeview', 'rowheight')
+            return HEADING_HEIGHT, int(row_height) if row_height else ROW_HEIGHT
+        except (tk.TclError, ValueError):
+            return HEADING_HEIGHT, ROW_HEIGHT
+
+    def on_configure(self, event):
+        heading_height, row_height = self.line_geometry()
+        visible_rows = max(1, (event.height - heading_height) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.offset = max(0, min(self.offset, len(self.listing) - visible_rows))
+            self.refresh()
+
+    def window_lines(self):
+        # Values for the lines on screen, in display order
+        if not len(self.listing):
+            return []
+        sort_field = self.fields[self.sort_column] if self.sort_column else None
+        return self.listing.fetch([self.fields[name] for name in self.column_names], self.offset,
+                                  self.offset + self.visible_rows, sort_field, self.sort_descending)
+
+    def refresh(self):
+        lines = [tuple('' if pd.isna(value) else value for value in line) for line in self.window_lines()]
+
+        # Keep exactly one Treeview item per visible line
+        items = self.tree.get_children()
+        for item in items[len(lines):]:
+            self.tree.delete(item)
+        for i, line in enumerate(lines):
+            if i < len(items):
+                self.tree.item(items[i], values=line)
+            else:
+                self.tree.insert('', tk.END, values=line)
+
+        total = len(self.listing)
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + len(lines)) / total)
+        else:
+            self.scrollbar.set(0, 1)